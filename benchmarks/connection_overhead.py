@@ -0,0 +1,72 @@
+"""Compare per-call SQLite connections with DraftDatabase's persistent one.
+
+Usage: python benchmarks/connection_overhead.py [number of drafts]
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from draft_database import DraftDatabase
+
+
+def per_call_add_draft(db_path: str, title: str, url: str) -> None:
+    """The pre-WAL pattern: open, write, commit and close for every call."""
+    conn = sqlite3.connect(db_path, timeout=20)
+    try:
+        conn.execute(
+            "INSERT OR REPLACE INTO drafts (title, url, created_at) VALUES (?, ?, CURRENT_TIMESTAMP)",
+            (title, url)
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def per_call_get_draft(db_path: str, title: str) -> None:
+    conn = sqlite3.connect(db_path, timeout=20)
+    try:
+        conn.execute("SELECT title, url, created_at FROM drafts WHERE title = ?", (title,)).fetchone()
+    finally:
+        conn.close()
+
+
+def timed(label: str, count: int, func) -> float:
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<32} {elapsed * 1e6 / count:10.1f} us/call")
+    return elapsed
+
+
+def main(count: int = 3000) -> None:
+    titles = [f"User:Author{i % 97}/Drafts/Draft {i}" for i in range(count)]
+    print(f"{count} drafts")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Baseline: a fresh connection per call, default rollback journal
+        baseline_path = os.path.join(tmp, "baseline.db")
+        DraftDatabase(baseline_path).close()
+        with sqlite3.connect(baseline_path) as conn:
+            conn.execute("PRAGMA journal_mode=DELETE")
+        old_write = timed("per-call add_draft", count, lambda: [
+            per_call_add_draft(baseline_path, t, "https://example.org/" + t) for t in titles])
+        old_read = timed("per-call get_draft", count, lambda: [
+            per_call_get_draft(baseline_path, t) for t in titles])
+
+        db = DraftDatabase(os.path.join(tmp, "persistent.db"))
+        new_write = timed("persistent add_draft", count, lambda: [
+            db.add_draft(t, "https://example.org/" + t) for t in titles])
+        new_read = timed("persistent get_draft", count, lambda: [
+            db.get_draft(t) for t in titles])
+        db.close()
+
+    print(f"add_draft speedup: {old_write / new_write:.1f}x")
+    print(f"get_draft speedup: {old_read / new_read:.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 3000)
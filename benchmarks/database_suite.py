@@ -0,0 +1,163 @@
+"""Benchmark DraftDatabase operations against synthetic backlogs.
+
+Loads N drafts (and their authors) one call at a time and in bulk, then times
+the read paths the polling loop and the commands use. Every operation is
+timed per call and reported as ops/sec with p50/p99 latency, both on the
+console and in a JSON results file for comparison between runs.
+
+Usage: python benchmarks/database_suite.py [--sizes 100,10000,100000]
+                                           [--modes sql,cache] [--output results.json]
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Sequence
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from draft_database import DraftDatabase
+
+# Upper bound on timed calls of the point lookups per dataset
+MAX_LOOKUPS = 5000
+
+# Authors per draft; real backlogs have a few prolific authors
+DRAFTS_PER_AUTHOR = 5
+
+
+def percentile(samples: Sequence[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def measure(op: str, calls: Sequence, func: Callable) -> Dict:
+    """Call func once per item of calls and summarise the per-call latencies."""
+    latencies = []
+    start = time.perf_counter()
+    for args in calls:
+        t0 = time.perf_counter_ns()
+        func(*args)
+        latencies.append((time.perf_counter_ns() - t0) / 1000)
+    elapsed = time.perf_counter() - start
+    return {
+        'op': op,
+        'calls': len(latencies),
+        'seconds': round(elapsed, 6),
+        'ops_per_sec': round(len(latencies) / elapsed, 1),
+        'p50_us': round(percentile(latencies, 0.5), 2),
+        'p99_us': round(percentile(latencies, 0.99), 2)
+    }
+
+
+def measure_once(op: str, items: int, func: Callable) -> Dict:
+    """Time one bulk call and report it as items/sec."""
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    micros = round(elapsed * 1e6, 2)
+    return {
+        'op': op,
+        'calls': 1,
+        'items': items,
+        'seconds': round(elapsed, 6),
+        'ops_per_sec': round(items / elapsed, 1),
+        'p50_us': micros,
+        'p99_us': micros
+    }
+
+
+def dataset(size: int) -> tuple[Dict[str, str], Dict[str, str]]:
+    """Synthetic drafts (title -> url) and their authors (username -> user id)."""
+    authors = max(1, size // DRAFTS_PER_AUTHOR)
+    drafts = {}
+    for i in range(size):
+        title = f"User:Author{i % authors}/Drafts/Draft {i}"
+        drafts[title] = "https://2b2t.miraheze.org/wiki/" + title.replace(' ', '_')
+    users = {f"Author{i}": str(100000 + i) for i in range(authors)}
+    return drafts, users
+
+
+def run_size(size: int, cache: bool, tmp: str, rng: random.Random) -> List[Dict]:
+    drafts, users = dataset(size)
+    titles = list(drafts)
+    usernames = list(users)
+    lookups = min(size, MAX_LOOKUPS)
+    results = []
+
+    # Single-row writes as the bot issues them, on a fresh database
+    db = DraftDatabase(os.path.join(tmp, f"single-{size}-{cache}.db"), cache=cache)
+    results.append(measure('add_draft', [(t, drafts[t]) for t in titles], db.add_draft))
+    results.append(measure('add_user', [(u, users[u]) for u in usernames], db.add_user))
+    db.close()
+
+    # Bulk loads on another fresh database; this one is used for the reads
+    db = DraftDatabase(os.path.join(tmp, f"bulk-{size}-{cache}.db"), cache=cache)
+    results.append(measure_once('add_drafts (bulk)', size, lambda: db.add_drafts(drafts)))
+    results.append(measure_once('add_users (bulk)', len(users), lambda: db.add_users(users)))
+
+    # Listing everything gets slow at large sizes, so it runs fewer times
+    repeats = max(3, min(100, 1_000_000 // size))
+    results.append(measure('get_all_drafts', [()] * repeats, db.get_all_drafts))
+
+    sample = [(t,) for t in rng.sample(titles, lookups)]
+    results.append(measure('get_draft', sample, db.get_draft))
+    results.append(measure('get_draft (miss)', [(f"User:Nobody/Drafts/{i}",) for i in range(lookups)],
+                           db.get_draft))
+
+    sample = [(u,) for u in rng.choices(usernames, k=lookups)]
+    results.append(measure('get_user', sample, db.get_user))
+    results.append(measure('get_user_cache_age', sample, db.get_user_cache_age))
+    db.close()
+
+    for result in results:
+        result.update(size=size, mode='cache' if cache else 'sql')
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='100,10000,100000',
+                        help="comma-separated numbers of drafts (default: %(default)s)")
+    parser.add_argument('--modes', default='sql,cache',
+                        help="DraftDatabase modes to run: sql, cache or both (default: %(default)s)")
+    parser.add_argument('--output', default='database_results.json',
+                        help="JSON results file (default: %(default)s)")
+    parser.add_argument('--seed', type=int, default=2024, help="random seed for the lookup samples")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    modes = [mode.strip() for mode in args.modes.split(',')]
+    rng = random.Random(args.seed)
+
+    results = []
+    print(f"{'size':>7} {'mode':<5} {'operation':<20} {'calls':>6} {'ops/sec':>12} {'p50 us':>10} {'p99 us':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            for mode in modes:
+                for result in run_size(size, mode == 'cache', tmp, rng):
+                    results.append(result)
+                    print(f"{size:>7} {mode:<5} {result['op']:<20} {result['calls']:>6} "
+                          f"{result['ops_per_sec']:>12.1f} {result['p50_us']:>10.2f} {result['p99_us']:>10.2f}")
+
+    report = {
+        'benchmark': 'draft_database',
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'seed': args.seed,
+        'results': results
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
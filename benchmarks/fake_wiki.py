@@ -0,0 +1,391 @@
+"""A local stand-in for the 2b2t wiki's api.php, for load tests.
+
+Implements the parts of the MediaWiki Action API the bot uses: login and
+tokens, categorymembers, users, recentchanges, and the revisions,
+categories, redirects and info props, plus edit, move and delete. Pages
+carrying {{review}} are members of the review category, as on the real
+wiki, so approving or rejecting a draft takes it out of the listing.
+
+Every request is delayed by a configurable latency and counted per action.
+The server runs on its own thread and event loop, so its work does not show
+up as stalls in the bot's loop.
+"""
+import asyncio
+import collections
+import os
+import random
+import re
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from metrics import api_action
+
+CATEGORY = "Category:Drafts_awaiting_review"
+
+REVIEW = re.compile('{{review}}', re.IGNORECASE)
+
+# What "max" means for a bot account
+MAX_LIMIT = 5000
+
+
+@dataclass
+class Page:
+    pageid: int
+    title: str
+    content: str
+    revid: int
+    timestamp: str
+
+
+def _timestamp() -> str:
+    return time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+
+
+def _limit(value: Optional[str], default: int = 10) -> int:
+    if value is None:
+        return default
+    return MAX_LIMIT if value == 'max' else int(value)
+
+
+def _error(code: str, info: str) -> Dict[str, Any]:
+    return {'error': {'code': code, 'info': info}}
+
+
+class FakeWiki:
+    """In-memory wiki state behind an aiohttp api.php endpoint."""
+
+    def __init__(self, latency: float = 0.05, jitter: float = 0.0, category: str = CATEGORY):
+        self.latency = latency
+        self.jitter = jitter
+        self.category = category
+        self.requests: collections.Counter = collections.Counter()
+        self.pages: Dict[str, Page] = {}
+        self.users: Dict[str, int] = {}
+        self.changes: List[Dict[str, Any]] = []
+        self.csrf_token = 'fake-csrf-token+\\'
+        self._ids = iter(range(1, 1 << 62))
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._runner: Optional[web.AppRunner] = None
+        self._thread: Optional[threading.Thread] = None
+
+    # State
+
+    def reset(self, latency: Optional[float] = None) -> None:
+        """Forget all pages, users and changes."""
+        if latency is not None:
+            self.latency = latency
+        self.pages.clear()
+        self.users.clear()
+        self.changes.clear()
+        self.requests.clear()
+
+    def _next_id(self) -> int:
+        return next(self._ids)
+
+    def _record(self, kind: str, page: Page, **extra: Any) -> None:
+        self.changes.append({
+            'type': kind,
+            'ns': 2 if page.title.startswith('User:') else 0,
+            'title': page.title,
+            'pageid': page.pageid,
+            'revid': page.revid,
+            'rcid': self._next_id(),
+            'timestamp': page.timestamp,
+            **extra
+        })
+
+    def create_page(self, title: str, content: str) -> Page:
+        page = Page(self._next_id(), title, content, self._next_id(), _timestamp())
+        self.pages[title] = page
+        self._record('new', page)
+        return page
+
+    def add_drafts(self, count: int, authors: Optional[int] = None, redirect_every: int = 5) -> List[str]:
+        """Create ``count`` drafts awaiting review and register their authors.
+
+        Every ``redirect_every``-th draft also gets a redirect pointing at it.
+        """
+        authors = authors or max(1, count // 5)
+        first = len(self.pages)
+        titles = []
+        for i in range(first, first + count):
+            author = f"Author{i % authors}"
+            self.users.setdefault(author, 1000 + len(self.users))
+            title = f"User:{author}/Drafts/Draft {i}"
+            self.create_page(title, f"{{{{review}}}}\n'''Draft {i}''' by {author}.\n\n== History ==\n" + "Text. " * 200)
+            if redirect_every and i % redirect_every == 0:
+                self.create_page(f"User:{author}/Draft {i}", f"#REDIRECT [[{title}]]")
+            titles.append(title)
+        return titles
+
+    def in_category(self, page: Page) -> bool:
+        return page.title.startswith('User:') and REVIEW.search(page.content) is not None
+
+    def redirects_to(self, title: str) -> List[Page]:
+        target = f"#REDIRECT [[{title}]]"
+        return [page for page in self.pages.values() if page.content == target]
+
+    # HTTP
+
+    async def handle(self, request: web.Request) -> web.Response:
+        params = dict(request.query)
+        if request.method == 'POST':
+            params.update(await request.post())
+        self.requests[api_action(params)] += 1
+        await asyncio.sleep(self.latency + random.uniform(0, self.jitter))
+
+        handler = {
+            'query': self._query,
+            'login': self._login,
+            'edit': self._edit,
+            'move': self._move,
+            'delete': self._delete
+        }.get(params.get('action'))
+        if handler is None:
+            result = _error('badvalue', f"Unrecognized value for parameter \"action\": {params.get('action')}.")
+        elif handler in (self._edit, self._move, self._delete) and params.get('token') != self.csrf_token:
+            result = _error('badtoken', 'Invalid CSRF token.')
+        else:
+            result = handler(params)
+        return web.json_response(result)
+
+    def _login(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        if params.get('lgtoken') != 'fake-login-token+\\':
+            return {'login': {'result': 'WrongToken'}}
+        return {'login': {'result': 'Success', 'lguserid': 1, 'lgusername': params.get('lgname')}}
+
+    def _query(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        fv2 = params.get('formatversion') == '2'
+        query: Dict[str, Any] = {}
+        result: Dict[str, Any] = {'batchcomplete': True if fv2 else '', 'query': query}
+        if params.get('curtimestamp'):
+            result['curtimestamp'] = _timestamp()
+
+        if params.get('meta') == 'tokens':
+            if params.get('type') == 'login':
+                query['tokens'] = {'logintoken': 'fake-login-token+\\'}
+            else:
+                query['tokens'] = {'csrftoken': self.csrf_token}
+
+        listing = params.get('list')
+        if listing == 'categorymembers':
+            self._categorymembers(params, result)
+        elif listing == 'users':
+            query['users'] = [
+                {'userid': self.users[name], 'name': name} if name in self.users
+                else {'name': name, 'missing': True if fv2 else ''}
+                for name in params.get('ususers', '').split('|')
+            ]
+        elif listing == 'recentchanges':
+            self._recentchanges(params, result)
+
+        if 'prop' in params:
+            self._props(params, result, fv2)
+        return result
+
+    def _categorymembers(self, params: Dict[str, Any], result: Dict[str, Any]) -> None:
+        if params.get('cmtitle') != self.category:
+            result['query']['categorymembers'] = []
+            return
+        members = sorted(page.title for page in self.pages.values() if self.in_category(page))
+        start = params.get('cmcontinue', '')
+        members = [title for title in members if title >= start]
+        limit = _limit(params.get('cmlimit'))
+        result['query']['categorymembers'] = [
+            {'pageid': self.pages[title].pageid, 'ns': 2, 'title': title} for title in members[:limit]
+        ]
+        if len(members) > limit:
+            result['continue'] = {'cmcontinue': members[limit], 'continue': '-||'}
+
+    def _recentchanges(self, params: Dict[str, Any], result: Dict[str, Any]) -> None:
+        changes = self.changes
+        if params.get('rcnamespace'):
+            namespaces = {int(ns) for ns in params['rcnamespace'].split('|')}
+            changes = [change for change in changes if change['ns'] in namespaces]
+        if params.get('rctype'):
+            types = set(params['rctype'].split('|'))
+            changes = [change for change in changes if change['type'] in types]
+
+        newer = params.get('rcdir', 'older') == 'newer'
+        changes = sorted(changes, key=lambda change: (change['timestamp'], change['rcid']), reverse=not newer)
+        if params.get('rcstart'):
+            start = params['rcstart']
+            changes = [change for change in changes
+                       if (change['timestamp'] >= start if newer else change['timestamp'] <= start)]
+        if params.get('rccontinue'):
+            timestamp, rcid = params['rccontinue'].split('|')
+            position = (timestamp, int(rcid))
+            changes = [change for change in changes
+                       if ((change['timestamp'], change['rcid']) >= position if newer
+                           else (change['timestamp'], change['rcid']) <= position)]
+
+        limit = _limit(params.get('rclimit'))
+        result['query']['recentchanges'] = changes[:limit]
+        if len(changes) > limit:
+            following = changes[limit]
+            result['continue'] = {'rccontinue': f"{following['timestamp']}|{following['rcid']}",
+                                  'continue': '-||'}
+
+    def _props(self, params: Dict[str, Any], result: Dict[str, Any], fv2: bool) -> None:
+        props = set(params['prop'].split('|'))
+        pages = []
+        categories = []
+        redirects = []
+        normalized = []
+        for i, title in enumerate(params.get('titles', '').split('|')):
+            if '_' in title:
+                normalized.append({'fromencoded': False, 'from': title, 'to': title.replace('_', ' ')})
+                title = title.replace('_', ' ')
+            page = self.pages.get(title)
+            if page is None:
+                pages.append({'ns': 2 if title.startswith('User:') else 0, 'title': title,
+                              'missing': True if fv2 else '', '_key': str(-1 - i)})
+                continue
+            entry: Dict[str, Any] = {'pageid': page.pageid, 'ns': 2 if title.startswith('User:') else 0,
+                                     'title': title, '_key': str(page.pageid)}
+            if 'revisions' in props:
+                revision = {'revid': page.revid, 'parentid': 0, 'timestamp': page.timestamp}
+                if 'content' in params.get('rvprop', ''):
+                    revision['content' if fv2 else '*'] = page.content
+                entry['revisions'] = [revision]
+            if 'categories' in props and self.in_category(page):
+                wanted = params.get('clcategories')
+                if wanted is None or self.category in wanted.split('|'):
+                    categories.append(entry)
+            if 'info' in props:
+                entry.update(lastrevid=page.revid, touched=page.timestamp, length=len(page.content))
+            if 'redirects' in props:
+                redirects.extend((entry, source) for source in self.redirects_to(title))
+            pages.append(entry)
+
+        continues = {}
+        if categories:
+            # cllimit (default 10) applies across all titles, as on the real API
+            offset = int(params.get('clcontinue', 0))
+            limit = _limit(params.get('cllimit'))
+            for entry in categories[offset:offset + limit]:
+                entry['categories'] = [{'ns': 14, 'title': self.category}]
+            if len(categories) > offset + limit:
+                continues['clcontinue'] = str(offset + limit)
+
+        if redirects:
+            # rdlimit applies across all titles, as on the real API
+            offset = int(params.get('rdcontinue', 0))
+            limit = _limit(params.get('rdlimit'))
+            for entry, source in redirects[offset:offset + limit]:
+                entry.setdefault('redirects', []).append({'pageid': source.pageid, 'ns': 2, 'title': source.title})
+            if len(redirects) > offset + limit:
+                continues['rdcontinue'] = str(offset + limit)
+        if continues:
+            result['continue'] = {**continues, 'continue': '||'}
+
+        if normalized:
+            result['query']['normalized'] = normalized
+        keys = [entry.pop('_key') for entry in pages]
+        result['query']['pages'] = pages if fv2 else dict(zip(keys, pages))
+
+    def _edit(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        title = params['title']
+        page = self.pages.get(title)
+        if page is None:
+            if params.get('nocreate'):
+                return _error('missingtitle', "The page you specified doesn't exist.")
+            page = self.create_page(title, params.get('text', ''))
+            return {'edit': {'result': 'Success', 'pageid': page.pageid, 'title': title, 'new': '',
+                             'newrevid': page.revid, 'newtimestamp': page.timestamp}}
+        if params.get('baserevid') and int(params['baserevid']) != page.revid:
+            return _error('editconflict', 'Edit conflict.')
+
+        old_revid = page.revid
+        page.content = params.get('text', page.content)
+        page.revid = self._next_id()
+        page.timestamp = _timestamp()
+        self._record('edit', page)
+        return {'edit': {'result': 'Success', 'pageid': page.pageid, 'title': title, 'oldrevid': old_revid,
+                         'newrevid': page.revid, 'newtimestamp': page.timestamp}}
+
+    def _move(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        source, target = params['from'], params['to']
+        page = self.pages.get(source)
+        if page is None:
+            return _error('missingtitle', "The page you specified doesn't exist.")
+        if target in self.pages:
+            return _error('articleexists', 'A page of that name already exists.')
+
+        del self.pages[source]
+        page.title = target
+        page.timestamp = _timestamp()
+        self.pages[target] = page
+        self._record('log', Page(page.pageid, source, '', page.revid, page.timestamp),
+                     logtype='move', logaction='move', logparams={'target_ns': 0, 'target_title': target})
+        if not params.get('noredirect'):
+            self.create_page(source, f"#REDIRECT [[{target}]]")
+        return {'move': {'from': source, 'to': target, 'reason': params.get('reason', '')}}
+
+    def _delete(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        title = params['title']
+        page = self.pages.pop(title, None)
+        if page is None:
+            return _error('missingtitle', "The page you specified doesn't exist.")
+        page.timestamp = _timestamp()
+        self._record('log', page, logtype='delete', logaction='delete', logparams={})
+        return {'delete': {'title': title, 'reason': params.get('reason', ''), 'logid': self._next_id()}}
+
+    # Server lifecycle
+
+    def serve_in_thread(self, host: str = '127.0.0.1', port: int = 8765) -> str:
+        """Start the API on a background thread and return its api.php URL."""
+        started = threading.Event()
+
+        async def start() -> None:
+            app = web.Application()
+            app.router.add_route('*', '/w/api.php', self.handle)
+            self._runner = web.AppRunner(app, access_log=None)
+            await self._runner.setup()
+            await web.TCPSite(self._runner, host, port).start()
+            started.set()
+
+        def run() -> None:
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(start())
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name='fake-wiki', daemon=True)
+        self._thread.start()
+        if not started.wait(10):
+            raise RuntimeError(f"Fake wiki did not start on {host}:{port}")
+        return f"http://{host}:{port}/w/api.php"
+
+    def stop(self) -> None:
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result(10)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(10)
+        self._loop = None
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve a fake 2b2t wiki API")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--drafts', type=int, default=500, help="drafts awaiting review (default: %(default)s)")
+    parser.add_argument('--latency', type=float, default=0.05, help="seconds per request (default: %(default)s)")
+    args = parser.parse_args()
+
+    wiki = FakeWiki(latency=args.latency)
+    wiki.add_drafts(args.drafts)
+    print(f"Serving {args.drafts} drafts on {wiki.serve_in_thread(port=args.port)}; Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        wiki.stop()
@@ -0,0 +1,299 @@
+"""End-to-end load test of the draft review loop against a local fake wiki.
+
+Serves benchmarks/fake_wiki.py on a background thread, points the bot at it
+through WIKI_API_URL and drives populate_db, DraftBot.fetch_draft and the
+approve/reject pipelines, one by one and in bulk, with stub Discord objects.
+For every phase it reports wall time, the wiki requests made per action and
+how long the bot's event loop was blocked.
+
+Usage: python benchmarks/load_harness.py [--scenario burst|slow_wiki|all]
+                                      [--backlog N] [--latency SECONDS] [--output load_results.json]
+"""
+import argparse
+import asyncio
+import contextlib
+import datetime
+import itertools
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_wiki import FakeWiki
+
+_ids = itertools.count(1_000_000)
+
+
+@dataclass
+class Scenario:
+    backlog: int  # drafts awaiting review when the bot starts
+    latency: float  # seconds the wiki takes per request
+    arrivals: int  # drafts created between the first and second poll
+    pipelines: int  # drafts approved or rejected concurrently at the end
+
+
+SCENARIOS = {
+    # 500 new drafts show up at once
+    'burst': Scenario(backlog=500, latency=0.05, arrivals=25, pipelines=10),
+    # A struggling wiki answering every request in 2 s
+    'slow_wiki': Scenario(backlog=50, latency=2.0, arrivals=5, pipelines=4),
+}
+
+
+class StubMessage:
+    def __init__(self, channel: 'StubChannel', content: Optional[str] = None, embeds: Optional[list] = None):
+        self.id = next(_ids)
+        self.channel = channel
+        self.content = content
+        self.embeds = embeds or []
+
+
+class StubThread:
+    def __init__(self, bot: 'StubBot', parent_id: int, name: str):
+        self.id = next(_ids)
+        self.parent_id = parent_id
+        self.name = name
+        self.archived = False
+        bot.channels[self.id] = self
+
+    async def archive(self) -> None:
+        self.archived = True
+
+    async def unarchive(self) -> None:
+        self.archived = False
+
+
+class StubChannel:
+    """The draft channel: records what the bot sends and the threads it opens."""
+
+    def __init__(self, bot: 'StubBot', channel_id: int):
+        self.id = channel_id
+        self.bot = bot
+        self.threads: List[StubThread] = []
+        self.messages: List[StubMessage] = []
+
+    async def send(self, content: Optional[str] = None, *, embed=None, embeds=None, **kwargs) -> StubMessage:
+        message = StubMessage(self, content, [embed] if embed else embeds)
+        self.messages.append(message)
+        return message
+
+    async def create_thread(self, name: str, message: Optional[StubMessage] = None, **kwargs) -> StubThread:
+        thread = StubThread(self.bot, self.id, name)
+        self.threads.append(thread)
+        return thread
+
+
+class StubBot:
+    """Just enough of commands.Bot for DraftBot."""
+
+    def __init__(self, channel_id: int):
+        self.channels: Dict[int, Any] = {}
+        self.channel = self.channels[channel_id] = StubChannel(self, channel_id)
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        return asyncio.get_running_loop()
+
+    def get_channel(self, channel_id: int):
+        return self.channels.get(channel_id)
+
+    async def fetch_channel(self, channel_id: int):
+        return self.channels.get(channel_id)
+
+    async def wait_until_ready(self) -> None:
+        # fetch_draft is called directly by the harness, so its task loop never starts
+        await asyncio.Event().wait()
+
+
+class StallMonitor:
+    """Measure how long the event loop fails to wake a task that sleeps for ``interval``."""
+
+    def __init__(self, interval: float = 0.005, threshold: float = 0.02):
+        self.interval = interval
+        self.threshold = threshold
+        self._task: Optional[asyncio.Task] = None
+        self.reset()
+
+    def reset(self) -> None:
+        self.stalled = 0.0
+        self.stalls = 0
+        self.max_lag = 0.0
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = loop.time() - start - self.interval
+            self.max_lag = max(self.max_lag, lag)
+            if lag > self.threshold:
+                self.stalled += lag
+                self.stalls += 1
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+
+
+class Phase:
+    """Collects the wall time, wiki requests and loop stalls of one step."""
+
+    def __init__(self, scenario: str, name: str, wiki: FakeWiki, monitor: StallMonitor, verbose: bool):
+        self.scenario = scenario
+        self.name = name
+        self.wiki = wiki
+        self.monitor = monitor
+        self.verbose = verbose
+        self.result: Dict[str, Any] = {}
+
+    async def __aenter__(self) -> 'Phase':
+        self.wiki.requests.clear()
+        self.monitor.reset()
+        self._start = time.perf_counter()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        elapsed = time.perf_counter() - self._start
+        self.result.update({
+            'scenario': self.scenario,
+            'phase': self.name,
+            'seconds': round(elapsed, 3),
+            'requests': sum(self.wiki.requests.values()),
+            'requests_by_action': dict(sorted(self.wiki.requests.items())),
+            'loop_stalled_seconds': round(self.monitor.stalled, 4),
+            'loop_stalls': self.monitor.stalls,
+            'loop_max_lag_ms': round(self.monitor.max_lag * 1000, 2),
+            'error': repr(exc) if exc else None
+        })
+        print(f"{self.scenario:<10} {self.name:<22} {elapsed:>9.2f}s {self.result['requests']:>6} requests "
+              f"stalled {self.monitor.stalled * 1000:>8.1f}ms (max {self.monitor.max_lag * 1000:.1f}ms)")
+        if self.verbose:
+            print(f"           {self.result['requests_by_action']}")
+
+
+async def run_scenario(name: str, scenario: Scenario, wiki: FakeWiki, tmp: str, verbose: bool) -> List[Dict]:
+    # Imported here so WIKI_API_URL and friends are set before the bot reads them
+    import draft_review
+    from draft_database import DraftDatabase
+    from wiki_client import AsyncWikiClient
+
+    wiki.reset(latency=scenario.latency)
+    titles = wiki.add_drafts(scenario.backlog)
+    monitor = StallMonitor()
+    monitor.start()
+    results = []
+
+    async def phase(phase_name: str, coro) -> Any:
+        step = Phase(name, phase_name, wiki, monitor, verbose)
+        try:
+            async with step:
+                return await coro
+        except Exception:
+            # Recorded in the phase result; carry on with the next phase
+            return None
+        finally:
+            results.append(step.result)
+
+    # populate_db on its own database: the cold category listing and user lookups
+    client = AsyncWikiClient()
+    scratch = DraftDatabase(os.path.join(tmp, f"{name}-populate.db"), cache=True)
+    await phase('populate_db', draft_review.populate_db(scratch, client))
+    scratch.close()
+    await client.close()
+
+    # fetch_draft as the bot runs it, against stub Discord objects
+    os.environ['DATABASE_PATH'] = os.path.join(tmp, f"{name}-bot.db")
+    bot = StubBot(draft_review.DRAFT_CHANNEL_ID)
+    cog = draft_review.DraftBot(bot)
+    cog.fetch_draft.cancel()
+    try:
+        await phase('fetch_draft (full)', cog.fetch_draft.coro(cog))
+        titles += wiki.add_drafts(scenario.arrivals)
+        await phase('fetch_draft (arrivals)', cog.fetch_draft.coro(cog))
+        await phase('fetch_draft (idle)', cog.fetch_draft.coro(cog))
+
+        # Approve half and reject half, all at once
+        jobs = []
+        for i, title in enumerate(titles[:scenario.pipelines]):
+            user, name_ = title[len('User:'):].split('/Drafts/')
+            if i % 2 == 0:
+                jobs.append(cog.approve(user, name_, "Load testing"))
+            else:
+                jobs.append(cog.reject(user, name_, "Load testing"))
+        await phase('approve/reject', asyncio.gather(*jobs))
+
+        # The same number of drafts again through /bulk's batched reads
+        await phase('bulk approve', cog.review_many(True, titles[scenario.pipelines:2 * scenario.pipelines],
+                                                    "Load testing"))
+
+        results[-1]['threads_created'] = len(bot.channel.threads)
+    finally:
+        await cog.wiki.close()
+        cog.executor.shutdown(wait=True)
+        await monitor.stop()
+    return results
+
+
+async def main_async(args: argparse.Namespace) -> List[Dict]:
+    wiki = FakeWiki()
+    url = wiki.serve_in_thread(port=args.port)
+
+    os.environ['WIKI_API_URL'] = url
+    os.environ['METRICS_PORT'] = '0'
+    os.environ.setdefault('2b2tWikiBotPassword', 'load-test')
+
+    names = list(SCENARIOS) if args.scenario == 'all' else [args.scenario]
+    results = []
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            for name in names:
+                scenario = SCENARIOS[name]
+                if args.backlog is not None:
+                    scenario.backlog = args.backlog
+                if args.latency is not None:
+                    scenario.latency = args.latency
+                print(f"== {name}: {asdict(scenario)}")
+                results.extend(await run_scenario(name, scenario, wiki, tmp, args.verbose))
+    finally:
+        wiki.stop()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scenario', default='all', choices=['all', *SCENARIOS])
+    parser.add_argument('--backlog', type=int, help="override the number of drafts awaiting review")
+    parser.add_argument('--latency', type=float, help="override the wiki's seconds per request")
+    parser.add_argument('--port', type=int, default=8765, help="port of the fake wiki (default: %(default)s)")
+    parser.add_argument('--output', default='load_results.json', help="JSON results file (default: %(default)s)")
+    parser.add_argument('--verbose', action='store_true', help="show the bot's log and requests per action")
+    args = parser.parse_args()
+    # The bot logs every draft and API response; keep the report readable
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.WARNING)
+
+    results = asyncio.run(main_async(args))
+    report = {
+        'benchmark': 'load_harness',
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import atexit
+import datetime
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import time
+from typing import Any, Optional
+
+EVENT_LOGGER = 'draftreview.events'
+
+event_logger = logging.getLogger(EVENT_LOGGER)
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def log_event(event: str, **fields: Any) -> None:
+    """Record a structured bot event (draft discovery, votes, wiki actions).
+
+    Only enqueues the record; the file is written by the background listener.
+    """
+    event_logger.info(event, extra={'event': event, 'fields': fields})
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Format records as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'event': getattr(record, 'event', None),
+            'message': record.getMessage()
+        }
+        entry.update(getattr(record, 'fields', {}))
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class RotatingLogHandler(logging.handlers.RotatingFileHandler):
+    """Roll the log over once it exceeds max_bytes or after interval seconds."""
+
+    def __init__(self, filename: str, max_bytes: int, backup_count: int, interval: float = 86400):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+        self.interval = interval
+        self.rollover_at = time.time() + interval
+
+    def shouldRollover(self, record: logging.LogRecord) -> int:
+        if time.time() >= self.rollover_at:
+            return 1
+        return super().shouldRollover(record)
+
+    def doRollover(self) -> None:
+        super().doRollover()
+        self.rollover_at = time.time() + self.interval
+
+
+class _EventFilter(logging.Filter):
+    def __init__(self, prefix: str = ''):
+        super().__init__()
+        self.prefix = prefix
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        event = getattr(record, 'event', None)
+        return event is not None and event.startswith(self.prefix)
+
+
+def setup_logging(log_dir: str, max_bytes: int = 10 * 1024 * 1024, backup_count: int = 7) -> None:
+    """Send all logging through a queue drained by a single background writer.
+
+    Writes plain text to discord.log, every structured event to events.jsonl
+    and vote events to votes.log, each rotated by size and daily. Logging calls
+    on the event loop only enqueue a record.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    os.makedirs(log_dir, exist_ok=True)
+
+    text_handler = RotatingLogHandler(os.path.join(log_dir, 'discord.log'), max_bytes, backup_count)
+    text_handler.setFormatter(logging.Formatter('%(asctime)s:%(levelname)s:%(name)s: %(message)s'))
+    text_handler.setLevel(logging.WARNING)
+
+    events_handler = RotatingLogHandler(os.path.join(log_dir, 'events.jsonl'), max_bytes, backup_count)
+    events_handler.setFormatter(JsonLinesFormatter())
+    events_handler.addFilter(_EventFilter())
+
+    votes_handler = RotatingLogHandler(os.path.join(log_dir, 'votes.log'), max_bytes, backup_count)
+    votes_handler.setFormatter(JsonLinesFormatter())
+    votes_handler.addFilter(_EventFilter('vote'))
+
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(logging.Formatter('%(levelname)s:%(name)s:%(message)s'))
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+
+    _listener = logging.handlers.QueueListener(
+        log_queue, text_handler, events_handler, votes_handler, console_handler,
+        respect_handler_level=True
+    )
+    _listener.start()
+    atexit.register(_listener.stop)
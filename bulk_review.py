@@ -0,0 +1,85 @@
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List
+
+import clean_redirects
+import draft_approve
+import draft_deny
+import draft_move
+from metrics import PIPELINE_SECONDS
+from wiki_session import WikiError, get_session, requested_titles
+from wikitext_cache import Revision, get_cache
+
+# Titles per query; the API's limit for regular accounts
+BATCH_SIZE = 50
+
+
+@dataclass
+class BulkPlan:
+    """Everything the writes of a bulk review need to know, read up front."""
+    revisions: Dict[str, Revision] = field(default_factory=dict)
+    redirects: Dict[str, List[str]] = field(default_factory=dict)
+    missing: List[str] = field(default_factory=list)
+
+    def revision(self, title: str) -> Revision:
+        revision = self.revisions.get(title)
+        if revision is None:
+            raise WikiError("missingtitle", f"{title} does not exist")
+        return revision
+
+
+def prefetch(titles: Iterable[str], redirects: bool = True) -> BulkPlan:
+    """Read the latest revision of every draft with one multi-title query per
+    BATCH_SIZE drafts, and their redirects likewise if ``redirects`` is set."""
+    S = get_session()
+    cache = get_cache()
+    titles = list(titles)
+    plan = BulkPlan()
+
+    with PIPELINE_SECONDS.time(stage='bulk_prefetch'):
+        for i in range(0, len(titles), BATCH_SIZE):
+            params = {
+                "action": "query",
+                "prop": "revisions",
+                "titles": "|".join(titles[i:i + BATCH_SIZE]),
+                "rvprop": "content|ids|timestamp",
+                "formatversion": "2"
+            }
+            while True:
+                DATA = S.get(params)
+                # Key everything by the title we asked for, not the wiki's normalised form
+                requested = requested_titles(DATA)
+                for page in DATA["query"]["pages"]:
+                    title = requested.get(page["title"], page["title"])
+                    if page.get("missing"):
+                        plan.missing.append(title)
+                    elif page.get("revisions"):
+                        # Large batches may leave some content to a continuation
+                        revision = page["revisions"][0]
+                        plan.revisions[title] = Revision(
+                            page["pageid"], revision["revid"], revision["timestamp"], revision["content"])
+                        cache.put(title, plan.revisions[title])
+                if 'continue' not in DATA:
+                    break
+                params.update(DATA['continue'])
+
+        if redirects:
+            plan.redirects = clean_redirects.find_redirects(S, titles)
+    return plan
+
+
+def approve_draft(plan: BulkPlan, user: str, name: str, categories: str | None) -> None:
+    """Approve one draft of a bulk review using the prefetched revision and redirects."""
+    title = f"User:{user}/Drafts/{name}"
+    with PIPELINE_SECONDS.time(stage='approve_page'):
+        draft_approve.approve_page(user, name, categories, revision=plan.revision(title))
+    with PIPELINE_SECONDS.time(stage='clean_redirects'):
+        clean_redirects.try_delete_redirects(get_session(), plan.redirects.get(title, []))
+    with PIPELINE_SECONDS.time(stage='move_page'):
+        draft_move.move_page(user, name)
+
+
+def reject_draft(plan: BulkPlan, user: str, name: str, summary: str) -> None:
+    """Reject one draft of a bulk review using the prefetched revision."""
+    title = f"User:{user}/Drafts/{name}"
+    with PIPELINE_SECONDS.time(stage='deny_page'):
+        draft_deny.deny_page(user, name, summary, revision=plan.revision(title))
@@ -1,80 +1,116 @@
-import requests
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from os import environ
-from dotenv import load_dotenv
+from typing import Dict, Iterable, List, Optional
 
-load_dotenv()
+import requests
 
+from wiki_session import WikiError, WikiSession, get_session, requested_titles
 
-def clean(user, name):
-    S = requests.Session()
-
-    URL = "https://2b2t.miraheze.org/w/api.php"
-
-    # Query list of redirects to the page
-    PARAMS = {
-        "action": "query",
-        "format": "json",
-        "titles": f"User:{user}/Drafts/{name}",
-        "prop": "redirects"
-    }
-
-    R = S.get(url=URL, params=PARAMS)
-    DATA = R.json()
-
-    PAGES = DATA["query"]["pages"]
-    for page in PAGES:
-        if "redirects" not in PAGES[page]:
-            return
-
-    # Delete redirects
-    # Step1: Retrieve login token
-    PARAMS_0 = {
-        'action': "query",
-        'meta': "tokens",
-        'type': "login",
-        'format': "json"
-    }
-
-    R = S.get(url=URL, params=PARAMS_0)
-    DATA = R.json()
-
-    LOGIN_TOKEN = DATA['query']['tokens']['logintoken']
-
-    # Step2: Send a post request to login. Use of main account for login is not
-    # supported. Obtain credentials via Special:BotPasswords
-    # (https://www.mediawiki.org/wiki/Special:BotPasswords) for lgname & lgpassword
-    PARAMS_1 = {
-        'action': "login",
-        'lgname': "2b2tWikiBot@2b2tWikiBot",
-        'lgpassword': environ['2b2tWikiBotPassword'],
-        'lgtoken': LOGIN_TOKEN,
-        'format': "json"
-    }
-
-    R = S.post(URL, data=PARAMS_1)
-
-    # Step 3: When logged in, retrieve a CSRF token
-    PARAMS_2 = {
-        'action': "query",
-        'meta': "tokens",
-        'format': "json"
-    }
-
-    R = S.get(url=URL, params=PARAMS_2)
-    DATA = R.json()
-
-    CSRF_TOKEN = DATA['query']['tokens']['csrftoken']
-
-    # Step 4: Send a post request to delete a page
-    for page in PAGES:
-        PARAMS_3 = {
-            'action': "delete",
-            'title': (PAGES[page]["redirects"][0]["title"]),
-            'token': CSRF_TOKEN,
-            'format': "json"
+logger = logging.getLogger(__name__)
+
+# Titles per query; the API's limit for regular accounts
+BATCH_SIZE = 50
+
+# Deletions sent at once; the write rate limit still applies
+DELETE_WORKERS = int(environ.get('REDIRECT_DELETE_WORKERS', '4'))
+
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def find_redirects(S: WikiSession, titles: Iterable[str]) -> Dict[str, List[str]]:
+    """Map each title to the titles of every redirect pointing at it.
+
+    Queries up to BATCH_SIZE titles at once and follows ``rdcontinue``, so
+    pages with many redirects are listed completely.
+    """
+    titles = list(titles)
+    redirects = {title: [] for title in titles}
+    for i in range(0, len(titles), BATCH_SIZE):
+        params = {
+            "action": "query",
+            "titles": "|".join(titles[i:i + BATCH_SIZE]),
+            "prop": "redirects",
+            "rdprop": "title",
+            "rdlimit": "max",
+            "formatversion": "2"
         }
+        while True:
+            DATA = S.get(params)
+            # Results come back under the wiki's form of each title, e.g. with
+            # underscores as spaces; file them under the title we were given
+            requested = requested_titles(DATA)
+            for page in DATA["query"]["pages"]:
+                title = requested.get(page["title"], page["title"])
+                redirects.setdefault(title, []).extend(
+                    redirect["title"] for redirect in page.get("redirects", []))
+            if 'continue' not in DATA:
+                break
+            params.update(DATA['continue'])
+    return redirects
+
+
+def _get_pool() -> ThreadPoolExecutor:
+    """Return the process-wide pool that sends deletions."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=DELETE_WORKERS, thread_name_prefix='redirects')
+        return _pool
+
+
+def delete_redirects(S: WikiSession, titles: Iterable[str]) -> None:
+    """Delete redirect pages, up to DELETE_WORKERS at a time across all callers.
+
+    All deletions share the session's login and token and are paced by its
+    rate limiter. A redirect that is already gone counts as deleted; if any
+    other deletion fails, raises WikiError once every deletion has been tried.
+    """
+    titles = list(titles)
+
+    def delete(title: str) -> Optional[str]:
+        DATA = S.post({
+            'action': "delete",
+            'title': title
+        })
+
+        logger.debug(f"Delete {title}: {DATA}")
+        code = DATA.get('error', {}).get('code')
+        return None if code == 'missingtitle' else code
+
+    if len(titles) <= 1 or DELETE_WORKERS <= 1:
+        codes = [delete(title) for title in titles]
+    else:
+        codes = list(_get_pool().map(delete, titles))
+    failed = {title: code for title, code in zip(titles, codes) if code is not None}
+    if failed:
+        raise WikiError(next(iter(failed.values())), "Could not delete "
+                        + ", ".join(f"{title} ({code})" for title, code in failed.items()))
 
-        R = S.post(URL, data=PARAMS_3)
-        DATA = R.json()
 
-        print(DATA)
+def try_delete_redirects(S: WikiSession, titles: Iterable[str]) -> bool:
+    """Delete redirect pages like delete_redirects, logging failures instead of raising.
+
+    Approval runs this after the draft has been edited, where a leftover
+    redirect must not stop the draft from being moved.
+    """
+    try:
+        delete_redirects(S, titles)
+        return True
+    except (WikiError, requests.RequestException) as e:
+        logger.warning(f"Leaving redirects in place: {e}")
+        return False
+
+
+def clean(user, name):
+    """Delete the redirects to an approved draft; failures are logged, not raised."""
+    title = f"User:{user}/Drafts/{name}"
+    S = get_session()
+    try:
+        redirects = find_redirects(S, [title])
+    except (WikiError, requests.RequestException) as e:
+        logger.warning(f"Could not list redirects to {title}: {e}")
+        return
+    try_delete_redirects(S, redirects[title])
@@ -0,0 +1,49 @@
+import logging
+
+from add_category import append_categories
+from draft_deny import strip_review
+from wiki_session import WikiError, get_session
+from wikitext_cache import latest_revision, remember_edit
+
+logger = logging.getLogger(__name__)
+
+
+def approve_page(user, name, categories=None, summary="Approved draft", revision=None):
+    """Strip {{review}} and add categories to a draft in a single edit.
+
+    The page is read once and saved against the revision we read
+    (baserevid/basetimestamp), so an edit made by someone else in between is
+    reported as an edit conflict instead of being overwritten. A revision
+    that was already fetched, e.g. by a bulk review, can be passed in.
+    """
+    title = f"User:{user}/Drafts/{name}"
+
+    S = get_session()
+
+    # Step 0: Get most recent revision of target page, cached if unchanged
+    if revision is None:
+        revision = latest_revision(S, title)
+
+    text = strip_review(revision.content)
+    if categories is not None:
+        text = append_categories(text, categories)
+        summary += ", added categories"
+
+    # Step 1: POST request to edit the page, based on the revision we read
+    PARAMS_1 = {
+        "action": "edit",
+        "title": title,
+        "bot": "1",
+        "nocreate": "1",
+        "baserevid": revision.revid,
+        "basetimestamp": revision.timestamp,
+        "text": text,
+        "summary": summary
+    }
+
+    DATA = S.post(PARAMS_1)
+    remember_edit(title, text, DATA)
+
+    logger.debug(f"Approve {title}: {DATA}")
+    if 'error' in DATA:
+        raise WikiError(DATA['error'].get('code', 'unknown'), DATA['error'].get('info', ''))
@@ -1,9 +1,12 @@
 import sqlite3
+import threading
 from dataclasses import dataclass
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterable, List, Set, Tuple
 import datetime
 import logging
 
+from metrics import timed_db
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -11,6 +14,8 @@ class Draft:
     title: str
     url: str
     created_at: datetime.datetime
+    thread_id: Optional[int] = None
+    message_id: Optional[int] = None
 
 @dataclass
 class User:
@@ -18,104 +23,370 @@ class User:
     user_id: str
     last_updated: datetime.datetime
 
+@dataclass
+class Vote:
+    vote_id: int
+    author: str
+    draft_name: str
+    required_votes: int
+    end_time: int
+    status: str
+    channel_id: Optional[int] = None
+    message_id: Optional[int] = None
+    approvals: int = 0
+    rejections: int = 0
+
+@dataclass
+class DraftEntry:
+    """A draft joined with its parsed author, name and cached author ID."""
+    title: str
+    url: str
+    created_at: datetime.datetime
+    user: str
+    name: str
+    user_id: Optional[str]
+
+@dataclass
+class DraftStats:
+    drafts: int
+    users: int
+    cached_users: int
+
 class DatabaseError(Exception):
     """Custom exception for database operations."""
     pass
 
+def parse_title(title: str) -> Tuple[str, str]:
+    """Split a draft title (User:<user>/Drafts/<name>) into user and name."""
+    user = title[title.find(':') + 1:title.find('/')]
+    name = title[title.find('/', title.find('/') + 1) + 1:]
+    return user, name
+
+# SQL equivalent of the user part of parse_title
+AUTHOR_SQL = "substr(title, instr(title, ':') + 1, instr(title, '/') - instr(title, ':') - 1)"
+
+# Columns drafts can be listed by, each paired with the title as a tie-breaker
+SORT_KEYS = {'age': 'created_at', 'author': 'author'}
+
+def page_cursor(entry: 'DraftEntry', sort: str = 'age') -> Tuple[str, str]:
+    """Get the keyset pagination cursor of a listed draft."""
+    if sort == 'author':
+        return entry.user, entry.title
+    return str(entry.created_at), entry.title
+
+def _utcnow() -> datetime.datetime:
+    """Current UTC time in the same form as SQLite's CURRENT_TIMESTAMP."""
+    return datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None, microsecond=0)
+
 class DraftDatabase:
-    def __init__(self, db_path: str = "drafts.db"):
+    def __init__(self, db_path: str = "drafts.db", cache: bool = False):
         self.db_path = db_path
+        # One connection is shared by every method and cog; the lock serialises
+        # access to it from the event loop and the wiki worker threads
+        self._lock = threading.RLock()
+        self._conn = self._get_connection()
         self._init_db()
 
+        # With cache=True every draft and user is also kept in memory. The
+        # write methods update these maps after committing, so reads never
+        # touch SQLite.
+        self.cache = cache
+        self._drafts: Dict[str, Draft] = {}
+        self._users: Dict[str, User] = {}
+        # Title -> (thread_id, message_id), including drafts no longer listed
+        self._threads: Dict[str, Tuple[int, Optional[int]]] = {}
+        if cache:
+            self._load_cache()
+
+    def _load_cache(self) -> None:
+        """Load every draft and user into memory."""
+        try:
+            with self._lock:
+                self._drafts = self._select_drafts()
+                self._threads = {
+                    row['title']: (row['thread_id'], row['message_id'])
+                    for row in self._conn.execute("SELECT title, thread_id, message_id FROM draft_threads")
+                }
+                rows = self._conn.execute("SELECT username, user_id, last_updated FROM users").fetchall()
+                self._users = {
+                    row['username']: User(
+                        username=row['username'],
+                        user_id=row['user_id'],
+                        last_updated=datetime.datetime.fromisoformat(row['last_updated'])
+                    )
+                    for row in rows
+                }
+        except sqlite3.Error as e:
+            logger.error(f"Failed to load cache: {e}")
+            raise DatabaseError(f"Failed to load cache: {e}")
+
     def _get_connection(self) -> sqlite3.Connection:
-        """Get a database connection with timeout."""
+        """Open the long-lived database connection and tune it."""
         try:
-            return sqlite3.connect(self.db_path, timeout=20)
+            conn = sqlite3.connect(
+                self.db_path,
+                timeout=20,
+                check_same_thread=False,
+                cached_statements=256
+            )
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA cache_size=-8000")  # 8 MiB
+            conn.execute("PRAGMA temp_store=MEMORY")
+            return conn
         except sqlite3.Error as e:
             logger.error(f"Failed to connect to database: {e}")
             raise DatabaseError(f"Database connection failed: {e}")
 
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
     def _init_db(self) -> None:
         """Initialize the database with required tables."""
-        conn = None
-        try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            
-            # Create drafts table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS drafts (
-                    title TEXT PRIMARY KEY,
-                    url TEXT NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            
-            # Create users table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS users (
-                    username TEXT PRIMARY KEY,
-                    user_id TEXT NOT NULL,
-                    last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            
-            conn.commit()
+        try:
+            with self._lock, self._conn:
+                cursor = self._conn.cursor()
+
+                # Create drafts table
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS drafts (
+                        title TEXT PRIMARY KEY,
+                        url TEXT NOT NULL,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                """)
+
+                # Discord thread and starter message of each draft. Kept apart from
+                # drafts so the mapping outlives a draft's removal: a draft that is
+                # rejected and resubmitted gets its old thread back
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS draft_threads (
+                        title TEXT PRIMARY KEY,
+                        thread_id INTEGER NOT NULL,
+                        message_id INTEGER
+                    )
+                """)
+
+                # Create users table
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS users (
+                        username TEXT PRIMARY KEY,
+                        user_id TEXT NOT NULL,
+                        last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                """)
+
+                # Create votes tables; ballots holds one row per voter per vote
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS votes (
+                        vote_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        author TEXT NOT NULL,
+                        draft_name TEXT NOT NULL,
+                        required_votes INTEGER NOT NULL,
+                        end_time INTEGER NOT NULL,
+                        status TEXT NOT NULL DEFAULT 'open',
+                        channel_id INTEGER,
+                        message_id INTEGER,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                """)
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS ballots (
+                        vote_id INTEGER NOT NULL REFERENCES votes (vote_id),
+                        voter_id INTEGER NOT NULL,
+                        approve INTEGER NOT NULL,
+                        PRIMARY KEY (vote_id, voter_id)
+                    )
+                """)
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_votes_status ON votes (status)")
+
+                # Indexes for keyset pagination of /list
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_drafts_created ON drafts (created_at, title)")
+                cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_drafts_author ON drafts ({AUTHOR_SQL}, title)")
+
+                # Create sync state table (recent changes high-water mark etc.)
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS sync_state (
+                        key TEXT PRIMARY KEY,
+                        value TEXT NOT NULL
+                    )
+                """)
         except sqlite3.Error as e:
             logger.error(f"Failed to initialize database: {e}")
             raise DatabaseError(f"Database initialization failed: {e}")
-        finally:
-            if conn:
-                conn.close()
 
+    @timed_db
     def add_draft(self, title: str, url: str) -> None:
         """Add a new draft to the database."""
-        conn = None
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            cursor.execute(
-                "INSERT OR REPLACE INTO drafts (title, url, created_at) VALUES (?, ?, CURRENT_TIMESTAMP)",
-                (title, url)
-            )
-            conn.commit()
+            now = _utcnow()
+            with self._lock:
+                with self._conn:
+                    self._conn.execute(
+                        "INSERT INTO drafts (title, url, created_at) VALUES (?, ?, ?) "
+                        "ON CONFLICT(title) DO UPDATE SET url = excluded.url, created_at = excluded.created_at",
+                        (title, url, str(now))
+                    )
+                if self.cache:
+                    self._cache_draft(title, url, now)
         except sqlite3.Error as e:
             logger.error(f"Failed to add draft {title}: {e}")
             raise DatabaseError(f"Failed to add draft: {e}")
-        finally:
-            if conn:
-                conn.close()
 
+    @timed_db
+    def add_drafts(self, drafts: Dict[str, str]) -> None:
+        """Add several drafts (title -> url) in a single transaction."""
+        try:
+            now = _utcnow()
+            with self._lock:
+                with self._conn:
+                    self._conn.executemany(
+                        "INSERT INTO drafts (title, url, created_at) VALUES (?, ?, ?) "
+                        "ON CONFLICT(title) DO UPDATE SET url = excluded.url, created_at = excluded.created_at",
+                        [(title, url, str(now)) for title, url in drafts.items()]
+                    )
+                if self.cache:
+                    for title, url in drafts.items():
+                        self._cache_draft(title, url, now)
+        except sqlite3.Error as e:
+            logger.error(f"Failed to add {len(drafts)} drafts: {e}")
+            raise DatabaseError(f"Failed to add drafts: {e}")
+
+    def _cache_draft(self, title: str, url: str, created_at: datetime.datetime) -> None:
+        """Update a cached draft in place, keeping its thread IDs."""
+        draft = self._drafts.get(title)
+        if draft is None:
+            self._drafts[title] = self._new_draft(title, url, created_at)
+        else:
+            draft.url = url
+            draft.created_at = created_at
+
+    def _new_draft(self, title: str, url: str, created_at: datetime.datetime) -> Draft:
+        """A cached draft, with the thread it had if it was listed before."""
+        thread_id, message_id = self._threads.get(title, (None, None))
+        return Draft(title=title, url=url, created_at=created_at, thread_id=thread_id, message_id=message_id)
+
+    @timed_db
+    def set_draft_thread(self, title: str, thread_id: int, message_id: Optional[int]) -> None:
+        """Record the Discord thread and starter message of a draft.
+
+        The mapping is kept after the draft is removed. A ``message_id`` of
+        None keeps the starter message already recorded for the draft.
+        """
+        try:
+            with self._lock:
+                with self._conn:
+                    self._conn.execute(
+                        "INSERT INTO draft_threads (title, thread_id, message_id) VALUES (?, ?, ?) "
+                        "ON CONFLICT(title) DO UPDATE SET thread_id = excluded.thread_id, "
+                        "message_id = COALESCE(excluded.message_id, draft_threads.message_id)",
+                        (title, thread_id, message_id)
+                    )
+                if self.cache:
+                    if message_id is None:
+                        message_id = self._threads.get(title, (None, None))[1]
+                    self._threads[title] = (thread_id, message_id)
+                    if title in self._drafts:
+                        self._drafts[title].thread_id = thread_id
+                        self._drafts[title].message_id = message_id
+        except sqlite3.Error as e:
+            logger.error(f"Failed to set thread of draft {title}: {e}")
+            raise DatabaseError(f"Failed to set draft thread: {e}")
+
+    @timed_db
+    def sync_drafts(self, current: Dict[str, str],
+                    removed: Optional[Iterable[str]] = None) -> Tuple[Set[str], Set[str]]:
+        """Bring the drafts table in line with the wiki in a single transaction.
+
+        Upserts every draft in ``current`` (title -> url), keeping the
+        created_at of drafts that were already known. If ``removed`` is None,
+        ``current`` is taken to be the whole category and every other draft is
+        deleted; otherwise only the titles in ``removed`` are deleted.
+
+        Returns the sets of titles that were added and removed.
+        """
+        try:
+            now = _utcnow()
+            with self._lock:
+                with self._conn:
+                    cursor = self._conn.cursor()
+                    existing = {row[0] for row in cursor.execute("SELECT title FROM drafts")}
+
+                    cursor.executemany(
+                        "INSERT INTO drafts (title, url, created_at) VALUES (?, ?, ?) "
+                        "ON CONFLICT(title) DO UPDATE SET url = excluded.url",
+                        [(title, url, str(now)) for title, url in current.items()]
+                    )
+
+                    if removed is None:
+                        gone = existing - current.keys()
+                    else:
+                        gone = (existing & set(removed)) - current.keys()
+                    cursor.executemany("DELETE FROM drafts WHERE title = ?", ((title,) for title in gone))
+
+                added = set(current) - existing
+                if self.cache:
+                    for title, url in current.items():
+                        if title in self._drafts:
+                            self._drafts[title].url = url
+                        else:
+                            self._drafts[title] = self._new_draft(title, url, now)
+                    for title in gone:
+                        self._drafts.pop(title, None)
+                return added, gone
+        except sqlite3.Error as e:
+            logger.error(f"Failed to sync {len(current)} drafts: {e}")
+            raise DatabaseError(f"Failed to sync drafts: {e}")
+
+    @timed_db
     def add_user(self, username: str, user_id: str) -> None:
         """Add or update a user in the database."""
-        conn = None
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            cursor.execute(
-                "INSERT OR REPLACE INTO users (username, user_id, last_updated) VALUES (?, ?, CURRENT_TIMESTAMP)",
-                (username, user_id)
-            )
-            conn.commit()
+            now = _utcnow()
+            with self._lock:
+                with self._conn:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO users (username, user_id, last_updated) VALUES (?, ?, ?)",
+                        (username, user_id, str(now))
+                    )
+                if self.cache:
+                    self._users[username] = User(username=username, user_id=user_id, last_updated=now)
         except sqlite3.Error as e:
             logger.error(f"Failed to add user {username}: {e}")
             raise DatabaseError(f"Failed to add user: {e}")
-        finally:
-            if conn:
-                conn.close()
 
+    @timed_db
+    def add_users(self, users: Dict[str, str]) -> None:
+        """Add or update several users (username -> user ID) in a single transaction."""
+        try:
+            now = _utcnow()
+            with self._lock:
+                with self._conn:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO users (username, user_id, last_updated) VALUES (?, ?, ?)",
+                        [(username, user_id, str(now)) for username, user_id in users.items()]
+                    )
+                if self.cache:
+                    for username, user_id in users.items():
+                        self._users[username] = User(username=username, user_id=user_id, last_updated=now)
+        except sqlite3.Error as e:
+            logger.error(f"Failed to add {len(users)} users: {e}")
+            raise DatabaseError(f"Failed to add users: {e}")
+
+    @timed_db
     def get_user(self, username: str) -> Optional[User]:
         """Get a user from the database."""
-        conn = None
+        if self.cache:
+            return self._users.get(username)
         try:
-            conn = self._get_connection()
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute(
-                "SELECT username, user_id, last_updated FROM users WHERE username = ?",
-                (username,)
-            )
-            row = cursor.fetchone()
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT username, user_id, last_updated FROM users WHERE username = ?",
+                    (username,)
+                ).fetchone()
             if row:
                 return User(
                     username=row['username'],
@@ -126,78 +397,352 @@ class DraftDatabase:
         except sqlite3.Error as e:
             logger.error(f"Failed to get user {username}: {e}")
             raise DatabaseError(f"Failed to get user: {e}")
-        finally:
-            if conn:
-                conn.close()
 
+    @timed_db
     def get_user_cache_age(self, username: str) -> Optional[float]:
         """Get the age of a user's cached data in seconds."""
         user = self.get_user(username)
         if user:
-            return (datetime.datetime.now() - user.last_updated).total_seconds()
+            return (_utcnow() - user.last_updated).total_seconds()
         return None
 
+    @timed_db
+    def get_stale_users(self, usernames: Iterable[str], max_age: float) -> Set[str]:
+        """Get the usernames that are not cached or were cached more than max_age seconds ago."""
+        usernames = set(usernames)
+        if not usernames:
+            return set()
+        if self.cache:
+            cutoff = _utcnow() - datetime.timedelta(seconds=max_age)
+            return {
+                username for username in usernames
+                if username not in self._users or self._users[username].last_updated < cutoff
+            }
+        try:
+            fresh = set()
+            names = list(usernames)
+            with self._lock:
+                # Stay well below SQLite's bound parameter limit
+                for i in range(0, len(names), 500):
+                    chunk = names[i:i + 500]
+                    rows = self._conn.execute(
+                        f"SELECT username FROM users WHERE username IN ({','.join('?' * len(chunk))}) "
+                        "AND last_updated >= datetime('now', ?)",
+                        (*chunk, f"-{int(max_age)} seconds")
+                    ).fetchall()
+                    fresh.update(row[0] for row in rows)
+            return usernames - fresh
+        except sqlite3.Error as e:
+            logger.error(f"Failed to get stale users: {e}")
+            raise DatabaseError(f"Failed to get stale users: {e}")
+
+    @timed_db
     def remove_draft(self, title: str) -> None:
         """Remove a draft from the database."""
-        conn = None
         try:
-            conn = self._get_connection()
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM drafts WHERE title = ?", (title,))
-            conn.commit()
+            with self._lock:
+                with self._conn:
+                    self._conn.execute("DELETE FROM drafts WHERE title = ?", (title,))
+                if self.cache:
+                    self._drafts.pop(title, None)
         except sqlite3.Error as e:
             logger.error(f"Failed to remove draft {title}: {e}")
             raise DatabaseError(f"Failed to remove draft: {e}")
-        finally:
-            if conn:
-                conn.close()
 
+    @timed_db
     def get_all_drafts(self) -> Dict[str, Draft]:
         """Get all drafts as a dictionary of title -> Draft object."""
-        conn = None
+        if self.cache:
+            return dict(self._drafts)
         try:
-            conn = self._get_connection()
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute("SELECT title, url, created_at FROM drafts")
-            rows = cursor.fetchall()
-            return {
-                row['title']: Draft(
-                    title=row['title'],
-                    url=row['url'],
-                    created_at=datetime.datetime.fromisoformat(row['created_at'])
-                )
-                for row in rows
-            }
+            with self._lock:
+                return self._select_drafts()
         except sqlite3.Error as e:
             logger.error(f"Failed to get all drafts: {e}")
             raise DatabaseError(f"Failed to get drafts: {e}")
-        finally:
-            if conn:
-                conn.close()
 
+    @staticmethod
+    def _draft_from_row(row: sqlite3.Row) -> Draft:
+        return Draft(
+            title=row['title'],
+            url=row['url'],
+            created_at=datetime.datetime.fromisoformat(row['created_at']),
+            thread_id=row['thread_id'],
+            message_id=row['message_id']
+        )
+
+    def _select_drafts(self) -> Dict[str, Draft]:
+        rows = self._conn.execute(
+            "SELECT d.title, d.url, d.created_at, t.thread_id, t.message_id "
+            "FROM drafts d LEFT JOIN draft_threads t ON t.title = d.title"
+        ).fetchall()
+        return {row['title']: self._draft_from_row(row) for row in rows}
+
+    @timed_db
+    def count_drafts(self) -> int:
+        """Get the number of drafts."""
+        if self.cache:
+            return len(self._drafts)
+        try:
+            with self._lock:
+                return self._conn.execute("SELECT COUNT(*) FROM drafts").fetchone()[0]
+        except sqlite3.Error as e:
+            logger.error(f"Failed to count drafts: {e}")
+            raise DatabaseError(f"Failed to count drafts: {e}")
+
+    @timed_db
     def get_draft(self, title: str) -> Optional[Draft]:
         """Get a specific draft by title."""
-        conn = None
+        if self.cache:
+            return self._drafts.get(title)
         try:
-            conn = self._get_connection()
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            cursor.execute(
-                "SELECT title, url, created_at FROM drafts WHERE title = ?",
-                (title,)
-            )
-            row = cursor.fetchone()
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT d.title, d.url, d.created_at, t.thread_id, t.message_id "
+                    "FROM drafts d LEFT JOIN draft_threads t ON t.title = d.title WHERE d.title = ?",
+                    (title,)
+                ).fetchone()
             if row:
-                return Draft(
-                    title=row['title'],
-                    url=row['url'],
-                    created_at=datetime.datetime.fromisoformat(row['created_at'])
-                )
+                return self._draft_from_row(row)
             return None
         except sqlite3.Error as e:
             logger.error(f"Failed to get draft {title}: {e}")
             raise DatabaseError(f"Failed to get draft: {e}")
-        finally:
-            if conn:
-                conn.close()
+
+    @timed_db
+    def get_state(self, key: str) -> Optional[str]:
+        """Get a stored sync state value."""
+        try:
+            with self._lock:
+                row = self._conn.execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+            return row[0] if row else None
+        except sqlite3.Error as e:
+            logger.error(f"Failed to get sync state {key}: {e}")
+            raise DatabaseError(f"Failed to get sync state: {e}")
+
+    @timed_db
+    def set_state(self, **values: str) -> None:
+        """Store one or more sync state values in a single transaction."""
+        try:
+            with self._lock, self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)",
+                    [(key, str(value)) for key, value in values.items()]
+                )
+        except sqlite3.Error as e:
+            logger.error(f"Failed to set sync state {list(values)}: {e}")
+            raise DatabaseError(f"Failed to set sync state: {e}")
+
+    def _select_entries(self, where: str = "1", params: Tuple = (), order: str = "created_at",
+                        descending: bool = False, limit: Optional[int] = None,
+                        offset: int = 0) -> List[DraftEntry]:
+        """Select drafts joined to their authors' cached user IDs."""
+        direction = "DESC" if descending else "ASC"
+        with self._lock:
+            rows = self._conn.execute(
+                f"""
+                SELECT d.title, d.url, d.created_at, d.author, u.user_id
+                FROM (SELECT title, url, created_at, {AUTHOR_SQL} AS author FROM drafts) AS d
+                LEFT JOIN users AS u ON u.username = d.author
+                WHERE {where}
+                ORDER BY d.{order} {direction}, d.title {direction}
+                LIMIT ? OFFSET ?
+                """,
+                (*params, -1 if limit is None else limit, offset)
+            ).fetchall()
+        return [
+            DraftEntry(
+                title=row['title'],
+                url=row['url'],
+                created_at=datetime.datetime.fromisoformat(row['created_at']),
+                user=row['author'],
+                name=parse_title(row['title'])[1],
+                user_id=row['user_id']
+            )
+            for row in rows
+        ]
+
+    @timed_db
+    def get_drafts_with_users(self, title_filter: Optional[str] = None,
+                              limit: Optional[int] = None) -> List[DraftEntry]:
+        """Get drafts joined to their authors' cached user IDs in one query.
+
+        ``title_filter`` keeps only titles containing that substring.
+        """
+        try:
+            if title_filter is None:
+                return self._select_entries(limit=limit)
+            return self._select_entries("instr(d.title, ?) > 0", (title_filter,), limit=limit)
+        except sqlite3.Error as e:
+            logger.error(f"Failed to get drafts with users: {e}")
+            raise DatabaseError(f"Failed to get drafts with users: {e}")
+
+    @timed_db
+    def get_drafts_page(self, sort: str = 'age', after: Optional[Tuple[str, str]] = None,
+                        before: Optional[Tuple[str, str]] = None, last: bool = False,
+                        offset: int = 0, limit: int = 10) -> List[DraftEntry]:
+        """Get one page of drafts using keyset pagination.
+
+        ``after``/``before`` are page_cursor values of the last/first entry of
+        the current page. ``last`` returns the final page, which holds the
+        drafts left over after the full pages. Without a cursor, ``offset``
+        rows are skipped, which is only meant for jumping to a page.
+        """
+        order = SORT_KEYS[sort]
+        try:
+            if after is not None:
+                return self._select_entries(f"(d.{order}, d.title) > (?, ?)", after, order, limit=limit)
+            if before is not None:
+                entries = self._select_entries(f"(d.{order}, d.title) < (?, ?)", before, order,
+                                               descending=True, limit=limit)
+                return entries[::-1]
+            if last:
+                with self._lock:
+                    count = self._conn.execute("SELECT COUNT(*) FROM drafts").fetchone()[0]
+                    # Keep the final page aligned with the pages before it
+                    size = (count - 1) % limit + 1 if count else limit
+                    entries = self._select_entries(order=order, descending=True, limit=size)
+                return entries[::-1]
+            return self._select_entries(order=order, limit=limit, offset=offset)
+        except sqlite3.Error as e:
+            logger.error(f"Failed to get drafts page: {e}")
+            raise DatabaseError(f"Failed to get drafts page: {e}")
+
+    @timed_db
+    def get_draft_stats(self, title_filter: Optional[str] = None) -> DraftStats:
+        """Count drafts, distinct authors and cached authors in one query."""
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    f"""
+                    SELECT COUNT(*), COUNT(DISTINCT d.author), COUNT(DISTINCT u.username)
+                    FROM (SELECT title, {AUTHOR_SQL} AS author FROM drafts) AS d
+                    LEFT JOIN users AS u ON u.username = d.author
+                    WHERE ?1 IS NULL OR instr(d.title, ?1) > 0
+                    """,
+                    (title_filter,)
+                ).fetchone()
+            return DraftStats(drafts=row[0], users=row[1], cached_users=row[2])
+        except sqlite3.Error as e:
+            logger.error(f"Failed to get draft stats: {e}")
+            raise DatabaseError(f"Failed to get draft stats: {e}")
+
+
+    _VOTE_SELECT = """
+        SELECT v.vote_id, v.author, v.draft_name, v.required_votes, v.end_time, v.status,
+               v.channel_id, v.message_id,
+               COALESCE(SUM(b.approve), 0) AS approvals,
+               COALESCE(SUM(1 - b.approve), 0) AS rejections
+        FROM votes AS v
+        LEFT JOIN ballots AS b ON b.vote_id = v.vote_id
+    """
+
+    @staticmethod
+    def _vote_from_row(row: sqlite3.Row) -> Vote:
+        return Vote(**{key: row[key] for key in row.keys()})
+
+    @timed_db
+    def create_vote(self, author: str, draft_name: str, required_votes: int, end_time: int) -> int:
+        """Open a new vote and return its ID."""
+        try:
+            with self._lock, self._conn:
+                cursor = self._conn.execute(
+                    "INSERT INTO votes (author, draft_name, required_votes, end_time) VALUES (?, ?, ?, ?)",
+                    (author, draft_name, required_votes, end_time)
+                )
+                return cursor.lastrowid
+        except sqlite3.Error as e:
+            logger.error(f"Failed to create vote for {draft_name}: {e}")
+            raise DatabaseError(f"Failed to create vote: {e}")
+
+    @timed_db
+    def set_vote_message(self, vote_id: int, channel_id: int, message_id: int) -> None:
+        """Record the message a vote is shown in."""
+        try:
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "UPDATE votes SET channel_id = ?, message_id = ? WHERE vote_id = ?",
+                    (channel_id, message_id, vote_id)
+                )
+        except sqlite3.Error as e:
+            logger.error(f"Failed to set message of vote {vote_id}: {e}")
+            raise DatabaseError(f"Failed to set vote message: {e}")
+
+    @timed_db
+    def cast_ballot(self, vote_id: int, voter_id: int, approve: bool) -> Tuple[int, int]:
+        """Record a voter's choice, replacing any earlier one, and return (approvals, rejections)."""
+        try:
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "INSERT INTO ballots (vote_id, voter_id, approve) VALUES (?, ?, ?) "
+                    "ON CONFLICT(vote_id, voter_id) DO UPDATE SET approve = excluded.approve",
+                    (vote_id, voter_id, int(approve))
+                )
+                row = self._conn.execute(
+                    "SELECT COALESCE(SUM(approve), 0), COALESCE(SUM(1 - approve), 0) FROM ballots WHERE vote_id = ?",
+                    (vote_id,)
+                ).fetchone()
+                return row[0], row[1]
+        except sqlite3.Error as e:
+            logger.error(f"Failed to cast ballot on vote {vote_id}: {e}")
+            raise DatabaseError(f"Failed to cast ballot: {e}")
+
+    @timed_db
+    def get_vote(self, vote_id: int) -> Optional[Vote]:
+        """Get a vote with its current tallies."""
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    self._VOTE_SELECT + " WHERE v.vote_id = ? GROUP BY v.vote_id",
+                    (vote_id,)
+                ).fetchone()
+            return self._vote_from_row(row) if row else None
+        except sqlite3.Error as e:
+            logger.error(f"Failed to get vote {vote_id}: {e}")
+            raise DatabaseError(f"Failed to get vote: {e}")
+
+    @timed_db
+    def get_votes(self, statuses: Iterable[str]) -> List[Vote]:
+        """Get every vote in one of the given statuses."""
+        statuses = list(statuses)
+        try:
+            with self._lock:
+                rows = self._conn.execute(
+                    self._VOTE_SELECT
+                    + f" WHERE v.status IN ({','.join('?' * len(statuses))}) GROUP BY v.vote_id",
+                    statuses
+                ).fetchall()
+            return [self._vote_from_row(row) for row in rows]
+        except sqlite3.Error as e:
+            logger.error(f"Failed to get votes: {e}")
+            raise DatabaseError(f"Failed to get votes: {e}")
+
+    @timed_db
+    def transition_vote(self, vote_id: int, from_statuses: Iterable[str], to_status: str) -> bool:
+        """Move a vote to a new status if it is currently in one of from_statuses.
+
+        Returns False if another caller changed the status first."""
+        from_statuses = list(from_statuses)
+        try:
+            with self._lock, self._conn:
+                cursor = self._conn.execute(
+                    f"UPDATE votes SET status = ? WHERE vote_id = ? "
+                    f"AND status IN ({','.join('?' * len(from_statuses))})",
+                    (to_status, vote_id, *from_statuses)
+                )
+                return cursor.rowcount == 1
+        except sqlite3.Error as e:
+            logger.error(f"Failed to update vote {vote_id}: {e}")
+            raise DatabaseError(f"Failed to update vote: {e}")
+
+
+_databases: Dict[str, DraftDatabase] = {}
+_databases_lock = threading.Lock()
+
+
+def get_database(db_path: str = "drafts.db", cache: bool = False) -> DraftDatabase:
+    """Return the shared DraftDatabase for a path, opening it on first use."""
+    with _databases_lock:
+        if db_path not in _databases:
+            _databases[db_path] = DraftDatabase(db_path, cache=cache)
+        return _databases[db_path]
@@ -1,89 +1,42 @@
-import requests
-from os import environ
+import logging
 import re
-from dotenv import load_dotenv
 
-load_dotenv()
+from wiki_session import WikiError, get_session
+from wikitext_cache import latest_revision, remember_edit
+
+logger = logging.getLogger(__name__)
 
 template = re.compile('{{review}}', re.IGNORECASE)
 
 
-def deny_page(user, name, summary="Rejected draft"):
-    text = ""
+def strip_review(text):
+    """Remove the {{review}} template from wikitext."""
+    return re.sub(template, '', text)
 
-    S = requests.Session()
 
-    URL = "https://2b2t.miraheze.org/w/api.php"
+def deny_page(user, name, summary="Rejected draft", revision=None):
+    title = f"User:{user}/Drafts/{name}"
 
-    # Step 0: Get most recent revision content of target page
-    PARAMS_0 = {
-        "action": "query",
-        "prop": "revisions",
-        "titles": f"User:{user}/Drafts/{name}",
-        "rvprop": "content",
-        "formatversion": "2",
-        "format": "json"
-    }
+    S = get_session()
 
-    R = S.get(url=URL, params=PARAMS_0)
-    DATA = R.json()
-    PAGES = DATA["query"]["pages"]
-    for page in PAGES:
-        REVISIONS = page["revisions"]
-        for revision in REVISIONS:
-            text = revision["content"]
+    # Step 0: Get most recent revision content of target page, cached if unchanged
+    if revision is None:
+        revision = latest_revision(S, title)
 
-    text = re.sub(template, '', text)
+    text = strip_review(revision.content)
 
-    # Step 1: GET request to fetch login token
+    # Step 1: POST request to edit a page
     PARAMS_1 = {
-        "action": "query",
-        "meta": "tokens",
-        "type": "login",
-        "format": "json"
-    }
-
-    R = S.get(url=URL, params=PARAMS_1)
-    DATA = R.json()
-
-    LOGIN_TOKEN = DATA['query']['tokens']['logintoken']
-
-    # Step 2: POST request to log in. Use of main account for login is not
-    # supported.
-    PARAMS_2 = {
-        "action": "login",
-        "lgname": "2b2tWikiBot@2b2tWikiBot",
-        "lgpassword": environ['2b2tWikiBotPassword'],
-        "lgtoken": LOGIN_TOKEN,
-        "format": "json"
-    }
-
-    R = S.post(URL, data=PARAMS_2)
-
-    # Step 3: GET request to fetch CSRF token
-    PARAMS_3 = {
-        "action": "query",
-        "meta": "tokens",
-        "format": "json"
-    }
-
-    R = S.get(url=URL, params=PARAMS_3)
-    DATA = R.json()
-
-    CSRF_TOKEN = DATA['query']['tokens']['csrftoken']
-
-    # Step 4: POST request to edit a page
-    PARAMS_4 = {
         "action": "edit",
-        "title": f"User:{user}/Drafts/{name}",
+        "title": title,
         "bot": "1",
-        "token": CSRF_TOKEN,
-        "format": "json",
         "text": text,
         "summary": summary
     }
 
-    R = S.post(URL, data=PARAMS_4)
-    DATA = R.json()
+    DATA = S.post(PARAMS_1)
+    remember_edit(title, text, DATA)
 
-    print(DATA)
+    logger.debug(f"Reject {title}: {DATA}")
+    if 'error' in DATA:
+        raise WikiError(DATA['error'].get('code', 'unknown'), DATA['error'].get('info', ''))
@@ -0,0 +1,63 @@
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import discord
+
+from draft_database import parse_title
+
+
+def draft_embed(name: str, url: str, user: str, user_id: Optional[str]) -> discord.Embed:
+    """Build the card shown for a draft."""
+    embed = discord.Embed(
+        title='Draft: ' + name,
+        url=url,
+        color=discord.Color.from_rgb(36, 255, 0)
+    )
+    if user_id:
+        embed.set_author(
+            name=user,
+            url=f"https://2b2t.miraheze.org/wiki/User:{user.replace(' ', '_')}",
+            icon_url=f"https://static.miraheze.org/2b2twiki/avatars/2b2twiki_{user_id}_l.png"
+        )
+    else:
+        embed.set_author(
+            name=user,
+            url=f"https://2b2t.miraheze.org/wiki/User:{user.replace(' ', '_')}"
+        )
+    return embed
+
+
+class EmbedCache:
+    """Rendered draft cards keyed by draft title.
+
+    Each card remembers the draft URL and author ID it was built from; if
+    either has changed since, the card is rebuilt on the next lookup. Cards
+    of drafts that leave the backlog are dropped with invalidate().
+    """
+
+    def __init__(self, max_size: int = 2000):
+        self.max_size = max_size
+        self._cards: "OrderedDict[str, Tuple[Tuple[str, Optional[str]], discord.Embed]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._cards)
+
+    def get(self, title: str, url: str, user_id: Optional[str]) -> discord.Embed:
+        """Get the card of a draft, building it if it is missing or outdated."""
+        version = (url, user_id)
+        cached = self._cards.get(title)
+        if cached is not None and cached[0] == version:
+            self._cards.move_to_end(title)
+            return cached[1]
+
+        user, name = parse_title(title)
+        embed = draft_embed(name, url, user, user_id)
+        self._cards[title] = (version, embed)
+        self._cards.move_to_end(title)
+        while len(self._cards) > self.max_size:
+            self._cards.popitem(last=False)
+        return embed
+
+    def invalidate(self, title: str) -> None:
+        """Drop the card of a draft."""
+        self._cards.pop(title, None)
@@ -1,45 +1,68 @@
 import discord
-import requests
+import aiohttp
 from discord.ext import tasks, commands
-import datetime
+from discord.ui import Modal, InputText, View, Button
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import time
 import re
 import os
 from os import path
 import logging
 import traceback
+from typing import Dict, List, Optional
 
+import draft_approve
 import draft_deny
 import draft_move
 import page_move
 import clean_redirects
-import add_category
-from draft_database import DraftDatabase
+import bulk_review
+import metrics
+from draft_database import Draft, DraftDatabase, DraftEntry, get_database, page_cursor, parse_title
+from draft_embeds import EmbedCache
+from bot_logging import log_event
+from thread_registry import ThreadRegistry
+from wiki_client import AsyncWikiClient
+from wiki_session import WikiError
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 good_url = re.compile('.+Drafts/.+')
 
-threads = set()
-
-headers = {
-    'User-Agent': '2b2tWikiBot/2.0 (Miraheze; 2b2t Wiki) Draft Review Bot'
-}
-
-def get_user_id(username: str) -> str:
-    """Get user ID from MediaWiki API."""
-    user_params = {
-        "action": "query",
-        "list": "users",
-        "ususers": username,
-        "format": "json"
-    }
-    user_request = requests.get("https://2b2t.miraheze.org/w/api.php", params=user_params, headers=headers)
-    user_json = user_request.json()
-    return str(user_json['query']['users'][0]['userid'])
-
-def get_user_ids(usernames: list[str]) -> dict[str, str]:
+DRAFT_CHANNEL_ID = 1150122572294410441  # draft-menders
+
+CATEGORY = "Category:Drafts_awaiting_review"
+
+# Seconds between full category re-listings; recent changes are used in between.
+# Only User: subpages are watched for changes, so drafts created elsewhere
+# (which page_move.fix_url moves into place) or on a bare user page are only
+# picked up by the next full re-listing
+FULL_SYNC_INTERVAL = int(os.getenv('FULL_SYNC_INTERVAL', '3600'))
+
+# Upper bound on approve/reject pipelines talking to the wiki at once
+WIKI_WORKERS = int(os.getenv('WIKI_WORKERS', '4'))
+
+# Local Prometheus endpoint; set METRICS_PORT=0 to disable it
+METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
+METRICS_PORT = int(os.getenv('METRICS_PORT', '9108'))
+
+def approve_pipeline(user: str, name: str, categories: str | None) -> None:
+    """Run the blocking wiki edits that approve a draft."""
+    # Template removal and categories go in one edit, then the move
+    with metrics.PIPELINE_SECONDS.time(stage='approve_page'):
+        draft_approve.approve_page(user, name, categories)
+    with metrics.PIPELINE_SECONDS.time(stage='clean_redirects'):
+        clean_redirects.clean(user, name)
+    with metrics.PIPELINE_SECONDS.time(stage='move_page'):
+        draft_move.move_page(user, name)
+
+def reject_pipeline(user: str, name: str, summary: str) -> None:
+    """Run the blocking wiki edits that reject a draft."""
+    with metrics.PIPELINE_SECONDS.time(stage='deny_page'):
+        draft_deny.deny_page(user, name, summary)
+
+async def get_user_ids(wiki: AsyncWikiClient, usernames: list[str]) -> dict[str, str]:
     """Get multiple user IDs in a single API call."""
     if not usernames:
         return {}
@@ -50,196 +73,398 @@ def get_user_ids(usernames: list[str]) -> dict[str, str]:
     
     for i in range(0, len(usernames), chunk_size):
         chunk = usernames[i:i + chunk_size]
-        user_params = {
-            "action": "query",
-            "list": "users",
-            "ususers": "|".join(chunk),
-            "format": "json"
-        }
         try:
-            print(f"=== Fetching user IDs for chunk {i//chunk_size + 1} ===")
-            user_request = requests.get("https://2b2t.miraheze.org/w/api.php", params=user_params)
-            user_request.raise_for_status()
-            user_json = user_request.json()
-            
-            if 'query' in user_json and 'users' in user_json['query']:
-                for user_info in user_json['query']['users']:
-                    if 'userid' in user_info:
-                        user_ids[user_info['name']] = str(user_info['userid'])
-            else:
-                print(f"Unexpected API response structure: {user_json}")
+            logger.debug(f"Fetching user IDs for chunk {i//chunk_size + 1}")
+            for user_info in await wiki.users(chunk):
+                if 'userid' in user_info:
+                    user_ids[user_info['name']] = str(user_info['userid'])
                 
-        except requests.RequestException as e:
-            print(f"API request failed for chunk {i//chunk_size + 1}: {e}")
-            if hasattr(e, 'response'):
-                print(f"Response content: {e.response.text}")
+        except aiohttp.ClientError as e:
+            logger.error(f"API request failed for chunk {i//chunk_size + 1}: {e}")
         except Exception as e:
-            print(f"Error processing chunk {i//chunk_size + 1}: {e}")
+            logger.error(f"Error processing chunk {i//chunk_size + 1}: {e}")
     
     return user_ids
 
-def populate_db(db: DraftDatabase):
-    """Populate the database with drafts from the wiki API."""
-    
-    params = {
-        "action": "query",
-        "list": "categorymembers",
-        "cmtitle": "Category:Drafts_awaiting_review",
-        "cmlimit": "100",
-        "format": "json"
-    }
-
-    url = 'https://2b2t.miraheze.org/w/api.php'
+def draft_title(entry: str) -> str:
+    """Expand 'Author/Name', 'Author/Drafts/Name' or a full title to User:Author/Drafts/Name."""
+    entry = entry.strip().replace('_', ' ')
+    if entry.startswith('User:'):
+        entry = entry[len('User:'):]
+    user, _, name = entry.partition('/')
+    if name.startswith('Drafts/'):
+        name = name[len('Drafts/'):]
+    return f"User:{user.strip()}/Drafts/{name.strip()}"
+
+def draft_link(title: str) -> str:
+    """Get the wiki URL of a draft."""
+    return f"https://2b2t.miraheze.org/wiki/{title.replace(' ', '_')}"
+
+async def cache_users(db: DraftDatabase, wiki: AsyncWikiClient, titles) -> None:
+    """Resolve and cache the user IDs of draft authors whose cache is missing or stale."""
+    # Extract usernames from titles and look up which ones need refreshing
+    usernames = {title[title.find(':') + 1:title.find('/')] for title in titles}
+    stale = db.get_stale_users(usernames, max_age=86400)  # Cache for 24 hours
+    if not stale:
+        return
+    user_ids = await get_user_ids(wiki, sorted(stale))
+    if user_ids:
+        db.add_users(user_ids)
+        logger.info(f"Updated user cache for {', '.join(user_ids)}")
+
+async def populate_db(db: DraftDatabase, wiki: AsyncWikiClient) -> tuple[set[str], set[str]]:
+    """Populate the database with drafts from the wiki API.
+
+    Returns the titles that were added to and removed from the database."""
     
     try:
-        request = requests.get(url, params=params, headers=headers)
-        request.raise_for_status()
-        
-        json_data = request.json()
-        
-        if 'query' not in json_data:
-            print(f"Error: 'query' not found in response. Full response: {json_data}")
-            return
+        # Only the titles are kept while listing; the URLs are derived from them
+        seen = set()
+        async for pages in wiki.categorymembers(CATEGORY):
+            titles = [page['title'] for page in pages]
+            await cache_users(db, wiki, titles)
+            seen.update(titles)
+
+        # Write the whole listing back in one transaction, evicting the drafts
+        # that have left the category, so a failed listing changes nothing
+        return db.sync_drafts({title: draft_link(title) for title in seen})
             
-        if 'categorymembers' not in json_data['query']:
-            print(f"Error: 'categorymembers' not found in query. Full response: {json_data}")
-            return
-
-        pages = json_data['query']['categorymembers']
-        for page in pages:
-            title = page['title']
-            link = f"https://2b2t.miraheze.org/wiki/{title.replace(' ', '_')}"
-            db.add_draft(title, link)
-            
-            # Extract username from title and update user cache if needed
-            username = title[title.find(':') + 1:title.find('/')]
-            cache_age = db.get_user_cache_age(username)
-            if cache_age is None or cache_age > 86400:  # Cache for 24 hours
-                try:
-                    user_id = get_user_id(username)
-                    db.add_user(username, user_id)
-                    print(f"Updated user cache for {username}")
-                except Exception as e:
-                    print(f"Failed to get user ID for {username}: {e}")
-            
-    except requests.exceptions.RequestException as e:
-        print(f"Request error in populate_db: {str(e)}")
-        if hasattr(e, 'response') and e.response is not None:
-            print(f"Response content: {e.response.text}")
+    except aiohttp.ClientError as e:
+        logger.error(f"Request error in populate_db: {str(e)}")
+        raise
+    except WikiError as e:
+        logger.error(f"API error in populate_db: {str(e)}")
         raise
     except ValueError as e:
-        print(f"JSON parsing error in populate_db: {str(e)}")
+        logger.error(f"JSON parsing error in populate_db: {str(e)}")
         raise
     except Exception as e:
-        print(f"Unexpected error in populate_db: {str(e)}")
+        logger.error(f"Unexpected error in populate_db: {str(e)}")
         raise
 
+async def full_sync(db: DraftDatabase, wiki: AsyncWikiClient) -> tuple[set[str], set[str]]:
+    """Re-list the whole category and reset the recent changes high-water mark."""
+    # Read the mark before listing so changes made during the listing are replayed
+    latest = await wiki.latest_change()
+    with metrics.SYNC_SECONDS.time(mode='full'):
+        changes = await populate_db(db, wiki)
+    if latest:
+        db.set_state(rc_timestamp=latest['timestamp'], rc_id=latest['rcid'])
+    return changes
+
+async def sync_changes(db: DraftDatabase, wiki: AsyncWikiClient) -> tuple[set[str], set[str]]:
+    """Apply draft additions and removals seen in recent changes since the last poll.
+
+    Returns the titles that were added to and removed from the database."""
+    rc_timestamp = db.get_state('rc_timestamp')
+    rc_id = int(db.get_state('rc_id') or 0)
+
+    start = time.perf_counter()
+
+    # rcstart is inclusive, so skip changes we have already processed
+    touched = set()
+    for change in await wiki.recentchanges(rc_timestamp):
+        if change['rcid'] <= rc_id:
+            continue
+        rc_timestamp, rc_id = change['timestamp'], change['rcid']
+        # Revision-deleted and suppressed entries have no title
+        title = change.get('title')
+        if title is None:
+            continue
+        touched.add(title)
+        # Moves also affect the page they were moved to
+        target = change.get('logparams', {}).get('target_title')
+        if target:
+            touched.add(target)
+
+    touched = sorted(title for title in touched if '/' in title)
+    added, removed = set(), set()
+    if touched:
+        members = await wiki.in_category(touched, CATEGORY)
+        await cache_users(db, wiki, members)
+        added, removed = db.sync_drafts(
+            {title: draft_link(title) for title in members},
+            removed=set(touched) - members
+        )
+
+    if rc_timestamp:
+        db.set_state(rc_timestamp=rc_timestamp, rc_id=rc_id)
+    metrics.SYNC_SECONDS.observe(time.perf_counter() - start, mode='changes')
+    return added, removed
+
+
+class JumpModal(Modal):
+    def __init__(self, list_view: 'DraftListView') -> None:
+        super().__init__(title="Go to page")
+        self.list_view = list_view
+        self.input = InputText(
+            label=f"Page (1-{list_view.pages})",
+            placeholder="Enter a page number",
+            required=True,
+            max_length=6
+        )
+        self.add_item(self.input)
+
+    async def callback(self, interaction: discord.Interaction):
+        try:
+            page = int(self.input.value) - 1
+        except ValueError:
+            await interaction.response.send_message("That is not a page number.", ephemeral=True)
+            return
+        page = min(max(page, 0), self.list_view.pages - 1)
+        self.list_view.load(page, offset=page * self.list_view.page_size)
+        await interaction.response.edit_message(embeds=self.list_view.render(), view=self.list_view)
+
+
+class DraftListView(View):
+    """Paginated /list output. Only the page being shown is queried and rendered."""
+
+    def __init__(self, db: DraftDatabase, embeds: EmbedCache, sort: str = 'age',
+                 page_size: int = 10, timeout: float = 600):
+        super().__init__(timeout=timeout)
+        self.db = db
+        self.embeds = embeds
+        self.sort = sort
+        self.page_size = page_size
+        self.entries: list[DraftEntry] = []
+        self.page = 0
+        self.pages = 1
+        self.message = None
+
+    def load(self, page: int = 0, **query) -> None:
+        """Fetch one page of drafts; query is passed to DraftDatabase.get_drafts_page."""
+        self.pages = max(1, -(-self.db.count_drafts() // self.page_size))
+        self.entries = self.db.get_drafts_page(self.sort, limit=self.page_size, **query)
+        if not self.entries and page > 0:
+            # The backlog shrank under us; fall back to the final page
+            self.entries = self.db.get_drafts_page(self.sort, limit=self.page_size, last=True)
+            page = self.pages - 1
+        self.page = min(page, self.pages - 1)
+
+        self.first.disabled = self.previous.disabled = self.page == 0
+        self.next.disabled = self.last.disabled = self.page >= self.pages - 1
+        self.jump.label = f"Page {self.page + 1}/{self.pages}"
+
+    def render(self) -> list[discord.Embed]:
+        return [self.embeds.get(entry.title, entry.url, entry.user_id) for entry in self.entries]
+
+    async def _show(self, interaction: discord.Interaction, page: int, **query):
+        self.load(page, **query)
+        await interaction.response.edit_message(embeds=self.render(), view=self)
+
+    @discord.ui.button(label="⏮", style=discord.ButtonStyle.grey)
+    async def first(self, button: Button, interaction: discord.Interaction):
+        await self._show(interaction, 0)
+
+    @discord.ui.button(label="◀", style=discord.ButtonStyle.grey)
+    async def previous(self, button: Button, interaction: discord.Interaction):
+        await self._show(interaction, self.page - 1, before=page_cursor(self.entries[0], self.sort))
+
+    @discord.ui.button(label="Page 1/1", style=discord.ButtonStyle.blurple)
+    async def jump(self, button: Button, interaction: discord.Interaction):
+        await interaction.response.send_modal(JumpModal(self))
+
+    @discord.ui.button(label="▶", style=discord.ButtonStyle.grey)
+    async def next(self, button: Button, interaction: discord.Interaction):
+        await self._show(interaction, self.page + 1, after=page_cursor(self.entries[-1], self.sort))
+
+    @discord.ui.button(label="⏭", style=discord.ButtonStyle.grey)
+    async def last(self, button: Button, interaction: discord.Interaction):
+        await self._show(interaction, self.pages - 1, last=True)
+
+    async def on_timeout(self) -> None:
+        """Disable paging once the view expires"""
+        for item in self.children:
+            item.disabled = True
+        if self.message:
+            await self.message.edit(view=self)
+
 
 class DraftBot(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        db_path = os.getenv('DATABASE_PATH')
-        self.db = DraftDatabase(db_path)
-        
-        # Initial population and caching
-        print("=== Performing initial database population and user caching ===")
-        populate_db(self.db)
-        
-        # Cache all users from existing drafts
-        drafts = self.db.get_all_drafts()
-        users_to_cache = set()
-        for title in drafts.keys():
-            username = title[title.find(':') + 1:title.find('/')]
-            cache_age = self.db.get_user_cache_age(username)
-            if cache_age is None or cache_age > 86400:  # Cache for 24 hours
-                users_to_cache.add(username)
-        
-        if users_to_cache:
-            print(f"=== Caching {len(users_to_cache)} users ===")
-            try:
-                user_ids = get_user_ids(list(users_to_cache))
-                for username, user_id in user_ids.items():
-                    self.db.add_user(username, user_id)
-                    print(f"Cached user ID for {username}")
-            except Exception as e:
-                print(f"Error caching user IDs: {e}")
-        
+        db_path = os.getenv('DATABASE_PATH', 'drafts.db')
+        self.db = get_database(db_path, cache=True)
+        self.wiki = AsyncWikiClient()
+        self.executor = ThreadPoolExecutor(max_workers=WIKI_WORKERS, thread_name_prefix='wiki')
+        # No full sync yet, so the first iteration always does one
+        self.last_full_sync = float('-inf')
+        self.threads = ThreadRegistry(DRAFT_CHANNEL_ID)
+        self.embeds = EmbedCache()
+        self.metrics_runner = None
+        # Interaction ID -> start time of slash commands still running
+        self._command_started: dict[int, float] = {}
         self.fetch_draft.start()
 
     def cog_unload(self):
         self.fetch_draft.cancel()
+        self.bot.loop.create_task(self.wiki.close())
+        if self.metrics_runner is not None:
+            self.bot.loop.create_task(self.metrics_runner.cleanup())
+        self.executor.shutdown(wait=False)
+
+    async def run_in_pool(self, func, *args):
+        """Run a blocking wiki pipeline on the worker pool and await its result."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, func, *args)
+
+    async def initial_population(self):
+        """Populate the database and cache the users of every known draft."""
+        logger.info("Performing initial database population and user caching")
+        await full_sync(self.db, self.wiki)
+        self.last_full_sync = time.monotonic()
+        
+        # Cache all users from existing drafts
+        try:
+            await cache_users(self.db, self.wiki, self.db.get_all_drafts().keys())
+        except Exception as e:
+            logger.error(f"Error caching user IDs: {e}")
 
     @tasks.loop(seconds=60)
     async def fetch_draft(self, *args):
-        channel = self.bot.get_channel(1150122572294410441)  # channel ID goes here (draft-menders)
+        channel = self.bot.get_channel(DRAFT_CHANNEL_ID)
+        start = time.perf_counter()
 
-        old_drafts = set(self.db.get_all_drafts().keys())
         try:
-            populate_db(self.db)
-            new_drafts = set(self.db.get_all_drafts().keys())
-            new_pages = [x for x in new_drafts if x not in old_drafts]
+            # Periodically re-list the whole category as a safety net for missed changes
+            if (self.db.get_state('rc_timestamp') is None
+                    or time.monotonic() - self.last_full_sync >= FULL_SYNC_INTERVAL):
+                new_pages, removed = await full_sync(self.db, self.wiki)
+                self.last_full_sync = time.monotonic()
+            else:
+                new_pages, removed = await sync_changes(self.db, self.wiki)
+
+            for page in removed:
+                self.embeds.invalidate(page)
 
             for page in new_pages:
                 name = page[page.find('/', page.find('/') + 1) + 1:]
                 user = page[page.find(':') + 1:page.find('/')]
                 if re.fullmatch(good_url, page) is None:
-                    page_move.fix_url(page, user, name)
+                    await page_move.fix_url(self.wiki, page, user, name)
                     continue
 
-                threads.update(channel.threads)
-                async for thread in channel.archived_threads():
-                    threads.add(thread)
-                thread = discord.utils.get(threads, name='Draft: ' + name)
-
-                draft_url = self.db.get_draft(page).url if self.db.get_draft(page) else None
-                if not draft_url:
+                draft = self.db.get_draft(page)
+                if not draft:
                     continue
+                thread = await self.get_thread(name, draft)
+
+                # Render the card now so /list can reuse it
+                user_data = self.db.get_user(user)
+                embed = self.embeds.get(page, draft.url, user_data.user_id if user_data else None)
 
                 # if no thread for this draft is found:
                 if thread is None:
-                    embed = discord.Embed(
-                        title='Draft: ' + name,
-                        url=draft_url,
-                        color=discord.Color.from_rgb(36, 255, 0)
-                    )
-                    
-                    # Get user ID from cache
-                    user_data = self.db.get_user(user)
-                    if user_data:
-                        embed.set_author(
-                            name=user,
-                            url=f"https://2b2t.miraheze.org/wiki/User:{user.replace(' ', '_')}",
-                            icon_url=f"https://static.miraheze.org/2b2twiki/avatars/2b2twiki_{user_data.user_id}_l.png"
-                        )
-                    else:
-                        embed.set_author(
-                            name=user,
-                            url=f"https://2b2t.miraheze.org/wiki/User:{user.replace(' ', '_')}"
-                        )
-
                     draft_message = await channel.send(embed=embed)
                     new_thread = await channel.create_thread(
                         name='Draft: ' + name,
                         message=draft_message,
                         reason="New draft"
                     )
-                    threads.add(new_thread)
-                    print(f"Found Draft:{user}/{name} at {datetime.datetime.now()}, new thread opened")
+                    self.threads.add(new_thread)
+                    self.db.set_draft_thread(page, new_thread.id, draft_message.id)
+                    logger.info(f"Found Draft:{user}/{name}, new thread opened")
+                    log_event('draft_discovered', title=page, thread_id=new_thread.id, thread='created')
                 # else if a thread is found but it is closed:
                 elif thread.archived:
                     await thread.unarchive()
-                    print(f"Found Draft:{user}/{name} at {datetime.datetime.now()}, opened existing thread")
+                    self.db.set_draft_thread(page, thread.id, None)
+                    logger.info(f"Found Draft:{user}/{name}, opened existing thread")
+                    log_event('draft_discovered', title=page, thread_id=thread.id, thread='unarchived')
                 else:
-                    print(f"Found Draft:{user}/{name} at {datetime.datetime.now()}, thread already exists")
-
-        except requests.HTTPError as e:
-            print(e)
+                    if draft.thread_id != thread.id:
+                        self.db.set_draft_thread(page, thread.id, None)
+                    logger.info(f"Found Draft:{user}/{name}, thread already exists")
+                    log_event('draft_discovered', title=page, thread_id=thread.id, thread='existing')
+
+        except (aiohttp.ClientError, WikiError) as e:
+            metrics.LOOP_ERRORS.inc(loop='fetch_draft')
+            logger.error(f"Draft fetch failed: {e}")
+        except Exception:
+            # tasks.loop only retries network errors, so anything else would
+            # stop polling for good; log it and try again next iteration
+            metrics.LOOP_ERRORS.inc(loop='fetch_draft')
+            logger.exception("Draft fetch failed")
+        finally:
+            metrics.LOOP_SECONDS.observe(time.perf_counter() - start, loop='fetch_draft')
 
     @fetch_draft.before_loop
     async def before_fetch_draft(self):
-        print('waiting...')
+        logger.info('Waiting for the bot to be ready')
         await self.bot.wait_until_ready()
 
+        if METRICS_PORT and self.metrics_runner is None:
+            try:
+                self.metrics_runner = await metrics.start_http_server(METRICS_HOST, METRICS_PORT)
+            except OSError as e:
+                logger.error(f"Could not start metrics endpoint: {e}")
+
+        # Active threads come with the gateway cache; archived ones are fetched
+        # by their stored ID when needed, so channel history is never scanned
+        channel = self.bot.get_channel(DRAFT_CHANNEL_ID)
+        if channel is not None:
+            self.threads.update(channel.threads)
+
+        # Anything escaping before_loop would stop fetch_draft for good, so log
+        # it and let the first iteration retry the full sync
+        try:
+            await self.initial_population()
+        except Exception:
+            logger.exception("Initial population failed")
+
+    async def get_thread(self, name: str, draft: Draft | None) -> discord.Thread | None:
+        """Find the thread of a draft from the registry or its stored thread ID."""
+        thread = self.threads.get(name)
+        if thread is not None or draft is None or draft.thread_id is None:
+            return thread
+        try:
+            thread = self.bot.get_channel(draft.thread_id) or await self.bot.fetch_channel(draft.thread_id)
+        except (discord.NotFound, discord.Forbidden):
+            return None
+        if isinstance(thread, discord.Thread):
+            self.threads.add(thread)
+            return thread
+        return None
+
+    @commands.Cog.listener()
+    async def on_thread_create(self, thread: discord.Thread):
+        self.threads.add(thread)
+
+    @commands.Cog.listener()
+    async def on_thread_update(self, before: discord.Thread, after: discord.Thread):
+        self.threads.add(after)
+
+    @commands.Cog.listener()
+    async def on_raw_thread_delete(self, payload: discord.RawThreadDeleteEvent):
+        self.threads.remove(payload.thread_id)
+
+    @commands.Cog.listener()
+    async def on_application_command(self, ctx: discord.ApplicationContext):
+        self._command_started[ctx.interaction.id] = time.perf_counter()
+
+    @commands.Cog.listener()
+    async def on_application_command_completion(self, ctx: discord.ApplicationContext):
+        self._observe_command(ctx)
+
+    @commands.Cog.listener()
+    async def on_application_command_error(self, ctx: discord.ApplicationContext, error: Exception):
+        metrics.COMMAND_ERRORS.inc(command=ctx.command.qualified_name)
+        self._observe_command(ctx)
+        # A listener replaces the library's default traceback printing
+        if not isinstance(error, commands.CheckFailure):
+            logger.error(f"Error in /{ctx.command.qualified_name}: {error}", exc_info=error)
+            return
+        try:
+            await ctx.respond("You don't have permission to use this command.", ephemeral=True)
+        except discord.HTTPException as e:
+            logger.error(f"Failed to send permission error: {str(e)}")
+
+    def _observe_command(self, ctx: discord.ApplicationContext) -> None:
+        """Record the latency of a slash command of any cog."""
+        start = self._command_started.pop(ctx.interaction.id, None)
+        if start is not None:
+            metrics.COMMAND_SECONDS.observe(time.perf_counter() - start, command=ctx.command.qualified_name)
+
     @discord.slash_command(name='help', description="Displays and explains this bot's functions")
     async def help(self, ctx: discord.ApplicationContext):
         embed = discord.Embed(title="Commands",
@@ -247,100 +472,58 @@ class DraftBot(commands.Cog):
                               color=0x24ff00)
         embed.add_field(name="List drafts awaiting review", value="/list", inline=False)
         embed.add_field(name="Vote on a draft", value="/vote <user> <article> <duration> <auto>", inline=False)
+        embed.add_field(name="Approve or reject several drafts", value="/bulk <approve|reject> <author/draft; ...> <categories or reason>", inline=False)
         await ctx.respond(embed=embed)
 
+    async def close_draft(self, user, name):
+        """Forget a reviewed draft and archive its thread."""
+        title = f"User:{user}/Drafts/{name}"
+        draft = self.db.get_draft(title)
+        self.db.remove_draft(title)
+        self.embeds.invalidate(title)
+        thread = await self.get_thread(name, draft)
+        if thread is not None:
+            await thread.archive()
+
     async def approve(self, user, name, categories):
-        datetime_object = datetime.datetime.now()
-        print(f"Command /approve {user} {name} run at {str(datetime_object)}")
-        draft_deny.deny_page(user, name, "Approved draft")
-        clean_redirects.clean(user, name)
-        if categories is not None:
-            add_category.add_category(user, name, categories)
-        draft_move.move_page(user, name)
-        self.db.remove_draft(f"User:{user}/Drafts/{name}")
-        thread = discord.utils.get(threads, name='Draft: ' + name)
-        await thread.archive()
-        user = user.replace(" ", "_")
-        name = name.replace(" ", "_")
-        print(f"Successfully moved page <https://2b2t.miraheze.org/wiki/User:{user}/Drafts/{name}> to page " +
-              f"<https://2b2t.miraheze.org/wiki/{name}>")
+        logger.info(f"Approving User:{user}/Drafts/{name}")
+        await self.run_in_pool(approve_pipeline, user, name, categories)
+        await self.close_draft(user, name)
+        logger.info(f"Moved {draft_link(f'User:{user}/Drafts/{name}')} to {draft_link(name)}")
 
     async def reject(self, user, name, summary):
-        datetime_object = datetime.datetime.now()
-        print(f"Command /reject {user} {name} {summary} run at {str(datetime_object)}")
+        logger.info(f"Rejecting User:{user}/Drafts/{name}: {summary}")
         if summary is None:
             summary = "Rejected draft"
-        draft_deny.deny_page(user, name, summary)
-        self.db.remove_draft(f"User:{user}/Drafts/{name}")
-        thread = discord.utils.get(threads, name='Draft: ' + name)
-        await thread.archive()
-        user = user.replace(" ", "_")
-        name = name.replace(" ", "_")
-        print(f"Successfully rejected page <https://2b2t.miraheze.org/wiki/User:{user}/Drafts/{name}>")
+        await self.run_in_pool(reject_pipeline, user, name, summary)
+        await self.close_draft(user, name)
+        logger.info(f"Rejected {draft_link(f'User:{user}/Drafts/{name}')}")
 
     @discord.slash_command(name='list', description="Provides a list of all pending drafts")
-    async def list(self, ctx: discord.ApplicationContext):
+    @discord.option(
+        "sort",
+        description="Order drafts by age or by author",
+        choices=["age", "author"],
+        required=False,
+        type=str
+    )
+    async def list(self, ctx: discord.ApplicationContext, sort: str = 'age'):
         # Defer the response immediately before any other operations
         await ctx.response.defer()
         
         try:
-            drafts = self.db.get_all_drafts()
-            if not drafts:
+            # Only the first page is queried; the buttons fetch the others on demand
+            view = DraftListView(self.db, self.embeds, sort=sort or 'age')
+            view.load()
+            if not view.entries:
                 await ctx.followup.send("No drafts found.")
                 return
 
-            # Create embeds
-            master_list = []
-            pages = []
-            master_list.append(pages)
-            counter = 0
-
-            # Create embeds
-            for page, draft in drafts.items():
-                name = page[page.find('/', page.find('/') + 1) + 1:]
-                user = page[page.find(':') + 1:page.find('/')]
-
-                embed = discord.Embed(
-                    title='Draft: ' + name,
-                    url=draft.url,
-                    color=discord.Color.from_rgb(36, 255, 0)
-                )
-                
-                # Get user ID from cache
-                user_data = self.db.get_user(user)
-                if user_data:
-                    embed.set_author(
-                        name=user,
-                        url=f"https://2b2t.miraheze.org/wiki/User:{user.replace(' ', '_')}",
-                        icon_url=f"https://static.miraheze.org/2b2twiki/avatars/2b2twiki_{user_data.user_id}_l.png"
-                    )
-                else:
-                    embed.set_author(
-                        name=user,
-                        url=f"https://2b2t.miraheze.org/wiki/User:{user.replace(' ', '_')}"
-                    )
-
-                if len(master_list[counter]) < 10:
-                    master_list[counter].append(embed)
-                else:
-                    counter += 1
-                    new_list = []
-                    master_list.append(new_list)
-                    master_list[counter].append(embed)
-
-            # Send all embeds using followup messages
-            for i, page_list in enumerate(master_list):
-                if page_list:  # Only send if there are embeds
-                    try:
-                        await ctx.followup.send(embeds=page_list)
-                    except discord.NotFound:
-                        # If interaction is no longer valid, log it but don't try to send error message
-                        logger.error("Interaction no longer valid")
-                        break
-                    except Exception as e:
-                        logger.error(f"Error sending embed batch {i}: {str(e)}")
-                        logger.error(traceback.format_exc())
-                        break
+            try:
+                view.message = await ctx.followup.send(embeds=view.render(), view=view)
+            except discord.NotFound:
+                # If interaction is no longer valid, log it but don't try to send error message
+                logger.error("Interaction no longer valid")
 
         except Exception as e:
             # Log the error but don't try to send it through Discord
@@ -399,14 +582,8 @@ class DraftBot(commands.Cog):
                 )
                 return
                 
-            # Get drafts
-            all_drafts = self.db.get_all_drafts()
-            
-            # Filter drafts if draft name provided
-            if draft:
-                drafts = {k: v for k, v in all_drafts.items() if draft in k}
-            else:
-                drafts = all_drafts
+            # Count drafts and cached users, filtered by draft name if provided
+            stats = self.db.get_draft_stats(draft or None)
             
             # Create debug info embed
             embed = discord.Embed(
@@ -422,15 +599,15 @@ class DraftBot(commands.Cog):
             
             embed.add_field(
                 name="Number of Drafts", 
-                value=str(len(drafts)), 
+                value=str(stats.drafts), 
                 inline=False
             )
             
-            if drafts:
+            if stats.drafts:
                 # Show first few drafts as sample
-                sample = list(drafts.items())[:5]
-                sample_text = "\n".join(f"- {title}" for title, _ in sample)
-                if len(drafts) > 5:
+                sample = self.db.get_drafts_with_users(draft or None, limit=5)
+                sample_text = "\n".join(f"- {entry.title}" for entry in sample)
+                if stats.drafts > 5:
                     sample_text += "\n..."
                 
                 embed.add_field(
@@ -440,20 +617,9 @@ class DraftBot(commands.Cog):
                 )
             
             # Add user cache info
-            users = set()
-            for title in drafts.keys():
-                username = title[title.find(':') + 1:title.find('/')]
-                users.add(username)
-            
-            cached_users = []
-            for username in users:
-                user_data = self.db.get_user(username)
-                if user_data:
-                    cached_users.append(username)
-            
             embed.add_field(
                 name="User Cache Status",
-                value=f"Cached {len(cached_users)} out of {len(users)} users",
+                value=f"Cached {stats.cached_users} out of {stats.users} users",
                 inline=False
             )
             
@@ -471,6 +637,117 @@ class DraftBot(commands.Cog):
             except Exception as e2:
                 logger.error(f"Failed to send error message: {str(e2)}", exc_info=True)
 
+    async def review_many(self, approve: bool, titles: List[str],
+                          text: Optional[str]) -> Dict[str, Optional[str]]:
+        """Approve or reject several drafts, returning each title's error or None.
+
+        All drafts are read with a few multi-title queries up front; the
+        writes of different drafts then run concurrently on the worker pool.
+        """
+        plan = await self.run_in_pool(bulk_review.prefetch, titles, approve)
+
+        async def review(title: str) -> Optional[str]:
+            user, name = parse_title(title)
+            try:
+                if approve:
+                    await self.run_in_pool(bulk_review.approve_draft, plan, user, name, text)
+                else:
+                    await self.run_in_pool(bulk_review.reject_draft, plan, user, name, text or "Rejected draft")
+            except Exception as e:
+                logger.error(f"Bulk review of {title} failed: {str(e)}")
+                return str(e)
+            await self.close_draft(user, name)
+            return None
+
+        errors = await asyncio.gather(*(review(title) for title in titles))
+        return dict(zip(titles, errors))
+
+    @discord.slash_command(name='bulk', description='Approve or reject several drafts at once')
+    @discord.option(
+        "action",
+        description="What to do with the drafts",
+        choices=["approve", "reject"],
+        type=str
+    )
+    @discord.option(
+        "drafts",
+        description="Drafts separated by semicolons, e.g. Author/Draft name; Other author/Other draft",
+        type=str
+    )
+    @discord.option(
+        "text",
+        description="Categories to add when approving, or the reason when rejecting",
+        required=False,
+        type=str
+    )
+    @commands.has_role(1159901879417974795)  # Bot Wrangler role
+    async def bulk(self, ctx: discord.ApplicationContext, action: str, drafts: str, text: str = None):
+        await ctx.defer(ephemeral=True)
+        approve = action == 'approve'
+
+        titles, unknown = [], []
+        for entry in drafts.split(';'):
+            if not entry.strip():
+                continue
+            title = draft_title(entry)
+            if title in titles or title in unknown:
+                continue
+            (titles if self.db.get_draft(title) else unknown).append(title)
+
+        if not titles:
+            await ctx.followup.send("None of those drafts are awaiting review.", ephemeral=True)
+            return
+
+        try:
+            results = await self.review_many(approve, titles, text)
+        except Exception as e:
+            logger.error(f"Error in bulk command: {str(e)}", exc_info=True)
+            await ctx.followup.send(f"An error occurred: {str(e)}", ephemeral=True)
+            return
+
+        done = [title for title, error in results.items() if error is None]
+        failed = {title: error for title, error in results.items() if error is not None}
+        log_event('bulk_review', action=action, drafts=len(titles), done=len(done),
+                  failed=sorted(failed), unknown=unknown)
+
+        embed = discord.Embed(
+            title=f"Bulk {'approval' if approve else 'rejection'}",
+            description=f"{len(done)} of {len(titles)} drafts {'approved' if approve else 'rejected'}.",
+            color=discord.Color.green() if not failed else discord.Color.orange()
+        )
+        if failed:
+            value = "\n".join(f"- {title}: {error}" for title, error in failed.items())
+            embed.add_field(name="Failed", value=value[:1024], inline=False)
+        if unknown:
+            value = "\n".join(f"- {title}" for title in unknown)
+            embed.add_field(name="Not awaiting review", value=value[:1024], inline=False)
+        await ctx.followup.send(embed=embed, ephemeral=True)
+
+    @discord.slash_command(
+        name='metrics',
+        description='Show request, database and loop timings'
+    )
+    @commands.has_role(1159901879417974795)  # Bot Wrangler role
+    async def metrics_command(self, ctx: discord.ApplicationContext):
+        """Summarise the collected metrics: count, mean, p50/p99 bucket and errors per label."""
+        embed = discord.Embed(title="Metrics", color=discord.Color.blue())
+        sections = [
+            ("Fetch loop", metrics.LOOP_SECONDS, metrics.LOOP_ERRORS),
+            ("Draft sync", metrics.SYNC_SECONDS, None),
+            ("Wiki API", metrics.WIKI_REQUEST_SECONDS, metrics.WIKI_ERRORS),
+            ("Approve/reject pipeline", metrics.PIPELINE_SECONDS, None),
+            ("Database", metrics.DB_SECONDS, metrics.DB_ERRORS),
+            ("Commands", metrics.COMMAND_SECONDS, metrics.COMMAND_ERRORS)
+        ]
+        for title, histogram, errors in sections:
+            lines = metrics.summary(histogram, errors, limit=10)
+            value = "\n".join(lines) or "No data yet"
+            # Embed field values are limited to 1024 characters
+            embed.add_field(name=title, value=f"```{value[:1000]}```", inline=False)
+        if self.metrics_runner is not None:
+            embed.set_footer(text=f"Prometheus endpoint: http://{METRICS_HOST}:{METRICS_PORT}/metrics")
+        await ctx.respond(embed=embed, ephemeral=True)
+
 
 def setup(bot: commands.Bot):
     bot.add_cog(DraftBot(bot))
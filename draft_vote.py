@@ -1,32 +1,31 @@
 import asyncio
 import time
 import os
-from typing import Optional, List
+from typing import Optional, Callable, Awaitable
 from datetime import datetime, timedelta
 import logging
 
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord.ui import Modal, InputText, View, Button
 
-from draft_database import DraftDatabase
+from bot_logging import log_event
+from draft_database import Vote, get_database
 
 # Set up logger
 logger = logging.getLogger(__name__)
 
+# Vote lifecycle: open -> approved/rejected (threshold reached, waiting for the
+# review modal) -> processing -> completed, or open -> timed_out
+DECIDED = ('approved', 'rejected')
 
-def log_vote(message: str) -> None:
-    """Log vote events to a file."""
-    log_dir = os.getenv('LOG_DIR', '/app/logs')
-    log_file_path = os.path.join(log_dir, 'votes.log')
-    os.makedirs(os.path.dirname(log_file_path), exist_ok=True)
-    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    with open(log_file_path, 'a') as file:
-        file.write(f"[{timestamp}] {message}\n")
+# Seconds over which tally updates of one vote message are coalesced
+UPDATE_WINDOW = 2.0
 
 
 class ReviewModal(Modal):
-    def __init__(self, is_approval: bool) -> None:
+    def __init__(self, is_approval: bool,
+                 on_submit: Optional[Callable[[discord.Interaction, str], Awaitable[None]]] = None) -> None:
         title = "Draft Review" if is_approval else "Draft Rejection"
         super().__init__(title=title)
 
@@ -40,97 +39,246 @@ class ReviewModal(Modal):
         )
         self.add_item(self.input)
         self.result = None
+        self.on_submit = on_submit
 
     async def callback(self, interaction: discord.Interaction):
         self.result = self.input.value
         await interaction.response.defer()
+        if self.on_submit is not None:
+            await self.on_submit(interaction, self.result)
 
 
 class VoteView(View):
-    def __init__(self,
-                 author: str,
-                 draft_name: str,
-                 required_votes: int = 3,
-                 timeout: float = 86400):  # 24 hours default
-        super().__init__(timeout=timeout)
-        self.author = author
-        self.draft_name = draft_name
-        self.required_votes = required_votes
-        self.approve_votes: List[int] = []
-        self.reject_votes: List[int] = []
-        self.result: Optional[bool] = None
-        self.end_time = int((datetime.now() + timedelta(seconds=timeout)).timestamp())
-        self.message = None
+    """Buttons of one vote.
+
+    The view holds no vote state of its own: ballots live in the database
+    and the buttons have stable custom_ids, so the view can be re-attached to
+    its message with bot.add_view after a restart.
+    """
+
+    def __init__(self, cog: 'DraftVote', vote: Vote):
+        super().__init__(timeout=None)
+        self.cog = cog
+        self.vote = vote
+        self.message: Optional[discord.Message] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        # Set by clicks whose tally has not been sent yet
+        self._dirty = False
+
+        self.approve_button = Button(
+            label=f"Approve ({vote.approvals})",
+            style=discord.ButtonStyle.green,
+            emoji="✅",
+            custom_id=f"draftvote:{vote.vote_id}:approve"
+        )
+        self.approve_button.callback = self.approve
+        self.add_item(self.approve_button)
+
+        self.reject_button = Button(
+            label=f"Reject ({vote.rejections})",
+            style=discord.ButtonStyle.red,
+            emoji="❌",
+            custom_id=f"draftvote:{vote.vote_id}:reject"
+        )
+        self.reject_button.callback = self.reject
+        self.add_item(self.reject_button)
+
+        if vote.status not in ('open',) + DECIDED:
+            self.disable()
 
     def _create_status_embed(self) -> discord.Embed:
         """Create an embed showing the current voting status."""
         embed = discord.Embed(
-            title=f"Vote: {self.draft_name}",
+            title=f"Vote: {self.vote.draft_name}",
             description=(
-                f"Draft by {self.author}\n\n"
-                f"Required votes: {self.required_votes}\n"
-                f"Ends: <t:{self.end_time}:R>\n\n"
+                f"Draft by {self.vote.author}\n\n"
+                f"Required votes: {self.vote.required_votes}\n"
+                f"Ends: <t:{self.vote.end_time}:R>\n\n"
                 f"Current status:\n"
-                f"✅ Approve: {len(self.approve_votes)}\n"
-                f"❌ Reject: {len(self.reject_votes)}"
+                f"✅ Approve: {self.vote.approvals}\n"
+                f"❌ Reject: {self.vote.rejections}"
             ),
             color=discord.Color.blue()
         )
         return embed
 
-    @discord.ui.button(label="Approve (0)", style=discord.ButtonStyle.green, emoji="✅")
-    async def approve(self, button: Button, interaction: discord.Interaction):
+    def schedule_refresh(self, message: Optional[discord.Message]) -> None:
+        """Edit the vote message with the latest tally at most once per UPDATE_WINDOW.
+
+        Clicks within the window share one edit, which always shows the
+        state at the time it is sent; a click that arrives while an edit is
+        in flight gets an edit of its own in the next window.
+        """
+        if message is not None:
+            self.message = message
+        if self.message is None:
+            return
+        self._dirty = True
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh())
+
+    async def _refresh(self) -> None:
+        while self._dirty:
+            await asyncio.sleep(UPDATE_WINDOW)
+            self._dirty = False
+            try:
+                await self.message.edit(embed=self._create_status_embed(), view=self)
+            except discord.HTTPException as e:
+                logger.error(f"Failed to update vote {self.vote.vote_id}: {str(e)}")
+
+    def disable(self) -> None:
+        for item in self.children:
+            item.disabled = True
+
+    async def approve(self, interaction: discord.Interaction):
         await self._handle_vote(interaction, True)
 
-    @discord.ui.button(label="Reject (0)", style=discord.ButtonStyle.red, emoji="❌")
-    async def reject(self, button: Button, interaction: discord.Interaction):
+    async def reject(self, interaction: discord.Interaction):
         await self._handle_vote(interaction, False)
 
     async def _handle_vote(self, interaction: discord.Interaction, is_approve: bool):
         """Handle a vote being cast."""
-        user_id = interaction.user.id
-
-        # Remove existing votes by this user
-        if user_id in self.approve_votes:
-            self.approve_votes.remove(user_id)
-        if user_id in self.reject_votes:
-            self.reject_votes.remove(user_id)
-
-        # Add new vote
-        if is_approve:
-            self.approve_votes.append(user_id)
-        else:
-            self.reject_votes.append(user_id)
+        db = self.cog.db
+        vote = db.get_vote(self.vote.vote_id)
+        if vote is None:
+            await interaction.response.send_message("This vote has ended.", ephemeral=True)
+            return
+
+        # The threshold was reached but the review modal was never submitted
+        if vote.status in DECIDED:
+            await self._send_review_modal(interaction, vote.status == 'approved')
+            return
+        if vote.status != 'open' or time.time() >= vote.end_time:
+            await interaction.response.send_message("This vote has ended.", ephemeral=True)
+            return
+
+        # Each voter has at most one ballot; voting again replaces it
+        vote.approvals, vote.rejections = db.cast_ballot(vote.vote_id, interaction.user.id, is_approve)
+        log_event('vote_cast', vote_id=vote.vote_id, voter=interaction.user.id, approve=is_approve,
+                  approvals=vote.approvals, rejections=vote.rejections)
+        self.vote = vote
 
         # Update button labels
-        self.children[0].label = f"Approve ({len(self.approve_votes)})"
-        self.children[1].label = f"Reject ({len(self.reject_votes)})"
+        self.approve_button.label = f"Approve ({vote.approvals})"
+        self.reject_button.label = f"Reject ({vote.rejections})"
 
         # Check if we've reached the required votes
-        if len(self.approve_votes) >= self.required_votes:
-            self.result = True
-            self.stop()
-        elif len(self.reject_votes) >= self.required_votes:
-            self.result = False
-            self.stop()
-
-        # Update the message
-        embed = self._create_status_embed()
-        await interaction.response.edit_message(embed=embed, view=self)
-
-    async def on_timeout(self) -> None:
-        """Handle view timeout"""
-        for item in self.children:
-            item.disabled = True
-        if self.message:
-            await self.message.edit(view=self)
+        result = None
+        if vote.approvals >= vote.required_votes:
+            result = True
+        elif vote.rejections >= vote.required_votes:
+            result = False
+
+        if result is not None and db.transition_vote(vote.vote_id, ['open'], 'approved' if result else 'rejected'):
+            vote.status = 'approved' if result else 'rejected'
+            # The modal is this interaction's response, so update the tally separately
+            await self._send_review_modal(interaction, result)
+            self.schedule_refresh(interaction.message)
+            return
+
+        # Acknowledge the click now and fold the message edit into the next refresh
+        await interaction.response.defer()
+        self.schedule_refresh(interaction.message)
+
+    async def _send_review_modal(self, interaction: discord.Interaction, is_approval: bool):
+        async def on_submit(modal_interaction: discord.Interaction, text: str):
+            await self.cog.finish_vote(self, is_approval, text, modal_interaction)
+
+        await interaction.response.send_modal(ReviewModal(is_approval=is_approval, on_submit=on_submit))
 
 
 class DraftVote(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        db_path = os.getenv('DRAFT_DB_PATH', 'drafts.db')
-        self.db = DraftDatabase(db_path)
+        # Share DraftBot's database unless a separate one is configured
+        db_path = os.getenv('DRAFT_DB_PATH', os.getenv('DATABASE_PATH', 'drafts.db'))
+        self.db = get_database(db_path, cache=True)
+        self._views_restored = False
+        self.expire_votes.start()
+
+    def cog_unload(self):
+        self.expire_votes.cancel()
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        """Re-attach the views of votes that were running before a restart."""
+        if self._views_restored:
+            return
+        self._views_restored = True
+        # A pipeline cut short by the restart goes back to waiting for the
+        # review modal, so the next click retries it
+        for vote in self.db.get_votes(['processing']):
+            status = 'approved' if vote.approvals >= vote.required_votes else 'rejected'
+            self.db.transition_vote(vote.vote_id, ['processing'], status)
+        for vote in self.db.get_votes(('open',) + DECIDED):
+            if vote.message_id is not None:
+                self.bot.add_view(VoteView(self, vote), message_id=vote.message_id)
+        logger.info("Restored persistent vote views")
+
+    async def finish_vote(self, view: VoteView, approved: bool, text: str,
+                          interaction: discord.Interaction) -> None:
+        """Run the approve/reject pipeline once a decided vote's modal is submitted."""
+        vote = view.vote
+        status = 'approved' if approved else 'rejected'
+        # Only one submission may run the pipeline
+        if not self.db.transition_vote(vote.vote_id, [status], 'processing'):
+            return
+
+        try:
+            if approved:
+                await self.bot.get_cog('DraftBot').approve(vote.author, vote.draft_name, text)
+                result_embed = discord.Embed(
+                    title="Draft Approved",
+                    description=f"{vote.draft_name} by {vote.author} has been approved.",
+                    color=discord.Color.green()
+                )
+            else:
+                await self.bot.get_cog('DraftBot').reject(vote.author, vote.draft_name, text)
+                result_embed = discord.Embed(
+                    title="Draft Rejected",
+                    description=f"{vote.draft_name} by {vote.author} has been rejected.",
+                    color=discord.Color.red()
+                )
+        except Exception as e:
+            # Let the next click retry
+            self.db.transition_vote(vote.vote_id, ['processing'], status)
+            logger.error(f"Error finishing vote {vote.vote_id}: {str(e)}", exc_info=True)
+            await interaction.followup.send(f"An error occurred: {str(e)}", ephemeral=True)
+            return
+
+        self.db.transition_vote(vote.vote_id, ['processing'], 'completed')
+        view.disable()
+        view.stop()
+        if interaction.message:
+            await interaction.message.edit(view=view)
+        await interaction.followup.send(embed=result_embed)
+        log_event('vote_completed', vote_id=vote.vote_id, draft=vote.draft_name, author=vote.author,
+                  result='approved' if approved else 'rejected')
+
+    @tasks.loop(seconds=60)
+    async def expire_votes(self):
+        """Close open votes whose deadline has passed."""
+        now = time.time()
+        for vote in self.db.get_votes(['open']):
+            if vote.end_time > now or not self.db.transition_vote(vote.vote_id, ['open'], 'timed_out'):
+                continue
+            log_event('vote_timed_out', vote_id=vote.vote_id, draft=vote.draft_name, author=vote.author)
+
+            channel = self.bot.get_channel(vote.channel_id) if vote.channel_id else None
+            if channel is None or vote.message_id is None:
+                continue
+            vote.status = 'timed_out'
+            view = VoteView(self, vote)
+            try:
+                await channel.get_partial_message(vote.message_id).edit(view=view)
+                await channel.send("Vote has timed out.", reference=discord.MessageReference(
+                    message_id=vote.message_id, channel_id=vote.channel_id, fail_if_not_exists=False))
+            except discord.HTTPException as e:
+                logger.error(f"Failed to close vote {vote.vote_id}: {str(e)}")
+
+    @expire_votes.before_loop
+    async def before_expire_votes(self):
+        await self.bot.wait_until_ready()
 
     @discord.slash_command(
         name="vote",
@@ -172,54 +320,18 @@ class DraftVote(commands.Cog):
                 )
                 return
 
-            # Create and start vote
-            view = VoteView(
-                author=author,
-                draft_name=draft_name,
-                required_votes=required_votes,
-                timeout=duration * 3600
-            )
+            # Create and start vote; it finishes through the view's callbacks
+            end_time = int((datetime.now() + timedelta(hours=duration)).timestamp())
+            vote_id = self.db.create_vote(author, draft_name, required_votes, end_time)
+            view = VoteView(self, self.db.get_vote(vote_id))
 
             embed = view._create_status_embed()
             message = await ctx.followup.send(embed=embed, view=view)
-            view.message = message
+            self.db.set_vote_message(vote_id, message.channel.id, message.id)
+            view.vote.channel_id, view.vote.message_id = message.channel.id, message.id
 
-            log_vote(f"Vote started for {draft_name} by {author}")
-
-            try:
-                await view.wait()
-
-                if view.result is None:  # Timeout
-                    await ctx.followup.send("Vote has timed out.")
-                    return
-
-                # Handle vote result
-                modal = ReviewModal(is_approval=view.result)
-                await ctx.interaction.response.send_modal(modal)
-                await modal.wait()
-
-                if view.result:  # Approved
-                    await self.bot.get_cog('DraftBot').approve(author, draft_name, modal.result)
-                    result_embed = discord.Embed(
-                        title="Draft Approved",
-                        description=f"{draft_name} by {author} has been approved.",
-                        color=discord.Color.green()
-                    )
-                else:  # Rejected
-                    await self.bot.get_cog('DraftBot').reject(author, draft_name, modal.result)
-                    result_embed = discord.Embed(
-                        title="Draft Rejected",
-                        description=f"{draft_name} by {author} has been rejected.",
-                        color=discord.Color.red()
-                    )
-
-                await ctx.followup.send(embed=result_embed)
-                log_vote(f"Vote completed for {draft_name} by {author}: {'Approved' if view.result else 'Rejected'}")
-
-            except asyncio.TimeoutError:
-                log_vote(f"Vote timed out for {draft_name} by {author}")
-                await message.edit(content="Vote has timed out.", view=None)
-                return
+            log_event('vote_started', vote_id=vote_id, draft=draft_name, author=author,
+                      required_votes=required_votes, end_time=end_time)
 
         except Exception as e:
             logger.error(f"Error in vote command: {str(e)}", exc_info=True)
@@ -227,4 +339,4 @@ class DraftVote(commands.Cog):
 
 
 def setup(bot: commands.Bot):
-    bot.add_cog(DraftVote(bot))
\ No newline at end of file
+    bot.add_cog(DraftVote(bot))
@@ -0,0 +1,195 @@
+import bisect
+import functools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, object]) -> LabelKey:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escaped = (value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+class Counter:
+    """A monotonically increasing count per label set."""
+
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+        self._values: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> Dict[LabelKey, float]:
+        with self._lock:
+            return dict(self._values)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(self.samples().items()):
+            lines.append(f"{self.name}{_format_labels(key)} {value}")
+        return lines
+
+
+class Histogram:
+    """Latency observations in cumulative buckets per label set."""
+
+    def __init__(self, name: str, description: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(sorted(buckets))
+        # label key -> [per-bucket counts (+Inf last), sum, count]
+        self._values: Dict[LabelKey, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = _label_key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def samples(self) -> Dict[LabelKey, Tuple[List[int], float, int]]:
+        with self._lock:
+            return {key: (list(counts), total, count) for key, (counts, total, count) in self._values.items()}
+
+    def quantile(self, q: float, counts: List[int], count: int) -> float:
+        """Estimate a quantile as the upper bound of the bucket it falls in."""
+        rank = q * count
+        seen = 0
+        for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+            seen += bucket_count
+            if seen >= rank:
+                return bound
+        return float('inf')
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        for key, (counts, total, count) in sorted(self.samples().items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float('inf') else repr(bound)
+                lines.append(f"{self.name}_bucket{_format_labels(key, ('le', le))} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {count}")
+        return lines
+
+    @contextmanager
+    def time(self, errors: Optional[Counter] = None, **labels) -> Iterator[None]:
+        """Observe the duration of the block; count it in ``errors`` if it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            if errors is not None:
+                errors.inc(**labels)
+            raise
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+
+WIKI_REQUEST_SECONDS = Histogram('draftreview_wiki_request_seconds', 'MediaWiki API request latency by action')
+WIKI_ERRORS = Counter('draftreview_wiki_errors_total', 'MediaWiki API requests that failed or returned an error')
+WIKI_THROTTLED = Counter('draftreview_wiki_throttled_total', 'MediaWiki API requests retried after being throttled')
+DB_SECONDS = Histogram('draftreview_db_seconds', 'DraftDatabase method latency',
+                       buckets=(0.0001, 0.00025, 0.0005) + DEFAULT_BUCKETS)
+DB_ERRORS = Counter('draftreview_db_errors_total', 'DraftDatabase method failures')
+LOOP_SECONDS = Histogram('draftreview_loop_seconds', 'Background loop iteration time')
+LOOP_ERRORS = Counter('draftreview_loop_errors_total', 'Background loop iterations that failed')
+COMMAND_SECONDS = Histogram('draftreview_command_seconds', 'Slash command latency')
+COMMAND_ERRORS = Counter('draftreview_command_errors_total', 'Slash commands that raised')
+PIPELINE_SECONDS = Histogram('draftreview_pipeline_seconds', 'Approve/reject pipeline stage latency')
+SYNC_SECONDS = Histogram('draftreview_sync_seconds', 'Draft listing sync duration by mode')
+WIKITEXT_CACHE = Counter('draftreview_wikitext_cache_total', 'Wikitext cache lookups by result')
+
+REGISTRY = [
+    WIKI_REQUEST_SECONDS, WIKI_ERRORS, WIKI_THROTTLED,
+    DB_SECONDS, DB_ERRORS,
+    LOOP_SECONDS, LOOP_ERRORS,
+    COMMAND_SECONDS, COMMAND_ERRORS,
+    PIPELINE_SECONDS, SYNC_SECONDS,
+    WIKITEXT_CACHE
+]
+
+
+def api_action(params: Dict[str, object]) -> str:
+    """Label a MediaWiki API request, e.g. ``query:categorymembers`` or ``edit``."""
+    action = str(params.get('action', 'unknown'))
+    if action == 'query':
+        detail = params.get('list') or params.get('prop') or params.get('meta')
+        if detail:
+            return f"query:{detail}"
+    return action
+
+
+def timed_db(func: Callable) -> Callable:
+    """Record the latency and failures of a DraftDatabase method."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with DB_SECONDS.time(DB_ERRORS, method=func.__name__):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def render() -> str:
+    """Render every metric in the Prometheus text exposition format."""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def summary(histogram: Histogram, errors: Optional[Counter] = None, limit: int = 15) -> List[str]:
+    """Summarise a histogram as 'labels: count, mean, p50, p99, errors' lines, busiest first."""
+    error_counts = errors.samples() if errors is not None else {}
+    rows = sorted(histogram.samples().items(), key=lambda item: item[1][2], reverse=True)
+    lines = []
+    for key, (counts, total, count) in rows[:limit]:
+        label = ",".join(value for _, value in key) or "-"
+        p50 = histogram.quantile(0.5, counts, count)
+        p99 = histogram.quantile(0.99, counts, count)
+        lines.append(
+            f"{label}: n={count} avg={total / count * 1000:.1f}ms "
+            f"p50<={p50 * 1000:g}ms p99<={p99 * 1000:g}ms err={int(error_counts.get(key, 0))}"
+        )
+    return lines
+
+
+async def start_http_server(host: str, port: int):
+    """Serve /metrics over HTTP on the running event loop; returns the aiohttp runner."""
+    from aiohttp import web
+
+    async def handle(request: web.Request) -> web.Response:
+        return web.Response(text=render(), content_type='text/plain', charset='utf-8')
+
+    app = web.Application()
+    app.router.add_get('/metrics', handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    logger.info(f"Serving metrics on http://{host}:{port}/metrics")
+    return runner
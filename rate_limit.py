@@ -0,0 +1,151 @@
+import email.utils
+import random
+import threading
+import time
+from os import environ
+from typing import Any, Dict, Optional
+
+# API error codes meaning we are sending too fast or the wiki is overloaded
+THROTTLE_CODES = {"ratelimited", "maxlag"}
+
+# HTTP statuses that are retried after backing off
+THROTTLE_STATUSES = {429, 503}
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def throttle_reason(status: int, data: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Why a response asks us to slow down, or None if it does not."""
+    if status in THROTTLE_STATUSES:
+        return str(status)
+    if isinstance(data, dict):
+        code = data.get('error', {}).get('code')
+        if code in THROTTLE_CODES:
+            return code
+    return None
+
+
+class TokenBucket:
+    """Spaces requests to ``rate`` per second with bursts of up to ``burst``.
+
+    Callers reserve a slot and sleep for the returned delay themselves, so one
+    bucket serves both threads and coroutines. The rate adapts: it is halved
+    whenever the wiki throttles us and creeps back up with every success.
+    """
+
+    def __init__(self, rate: float, burst: int = 1, min_rate: Optional[float] = None):
+        self.max_rate = rate
+        self.min_rate = min_rate if min_rate is not None else rate / 16
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take a slot and return how many seconds to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            # While paused, updated lies in the future and nothing refills
+            if now > self.updated:
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+            self.tokens -= 1
+            wait = self.updated - now
+            if self.tokens < 0:
+                wait += -self.tokens / self.rate
+            return wait
+
+    def pause(self, seconds: float) -> None:
+        """Hold every request for ``seconds`` and slow down afterwards."""
+        with self._lock:
+            now = time.monotonic()
+            # Requests already in flight when the pause began don't slow us down again
+            if self.updated <= now:
+                self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = 0.0
+            self.updated = max(self.updated, now + seconds)
+
+    def succeeded(self) -> None:
+        with self._lock:
+            # Additive increase: about 50 successes to recover from one halving
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 100)
+
+
+class RateLimiter:
+    """Shared read and write budgets for every request the bot sends to the wiki."""
+
+    def __init__(self, read_rate: float = 5.0, write_rate: float = 1.0, burst: int = 5,
+                 maxlag: Optional[int] = 5, max_retries: int = 5,
+                 base_delay: float = 1.0, max_delay: float = 120.0):
+        self.read = TokenBucket(read_rate, burst)
+        self.write = TokenBucket(write_rate, max(1, burst // 2))
+        self.maxlag = maxlag
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    @classmethod
+    def from_env(cls) -> 'RateLimiter':
+        maxlag = int(environ.get('WIKI_MAXLAG', '5'))
+        return cls(
+            read_rate=float(environ.get('WIKI_READ_RATE', '5')),
+            write_rate=float(environ.get('WIKI_WRITE_RATE', '1')),
+            maxlag=maxlag if maxlag > 0 else None,
+            max_retries=int(environ.get('WIKI_MAX_RETRIES', '5'))
+        )
+
+    def bucket(self, write: bool) -> TokenBucket:
+        return self.write if write else self.read
+
+    def reserve(self, write: bool) -> float:
+        return self.bucket(write).reserve()
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Delay before retry number ``attempt`` (0-based): Retry-After if given,
+        otherwise exponential with jitter so parallel callers do not retry in step."""
+        if retry_after is not None:
+            return min(self.max_delay, retry_after)
+        delay = min(self.max_delay, self.base_delay * 2 ** attempt)
+        return random.uniform(delay / 2, delay)
+
+    def throttled(self, write: bool, reason: str, attempt: int,
+                  retry_after: Optional[str] = None) -> float:
+        """Record a throttled response and return the delay before retrying.
+
+        ``ratelimited`` only concerns the kind of request that hit it; HTTP
+        429/503 and maxlag mean the whole wiki wants us to back off.
+        """
+        delay = self.backoff(attempt, parse_retry_after(retry_after))
+        self.bucket(write).pause(delay)
+        if reason != 'ratelimited':
+            self.bucket(not write).pause(delay)
+        return delay
+
+    def succeeded(self, write: bool) -> None:
+        self.bucket(write).succeeded()
+
+
+_limiter: Optional[RateLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def get_limiter() -> RateLimiter:
+    """Return the process-wide RateLimiter shared by the sync and async clients."""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter.from_env()
+        return _limiter
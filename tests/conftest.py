@@ -0,0 +1,131 @@
+"""Shared fixtures: the repository on sys.path and in-memory wiki and Discord stand-ins."""
+import importlib
+import os
+import sys
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import wikitext_cache
+from wikitext_cache import Revision, WikitextCache
+
+# Modules that look up the process-wide WikiSession with get_session()
+SESSION_MODULES = ('bulk_review', 'clean_redirects', 'draft_approve', 'draft_deny', 'draft_move')
+
+
+class FakeWikiSession:
+    """Stands in for WikiSession, serving pages from memory and recording writes.
+
+    ``pages`` maps titles to their latest Revision and ``redirects`` maps
+    titles to the redirects pointing at them. Titles are normalised the way
+    the wiki does it (underscores become spaces) and reported under
+    ``normalized``. ``errors`` maps an action, or the title a write targets,
+    to the error code the write is answered with. Redirect lists are split
+    into pages of ``rdlimit`` joined by ``rdcontinue``.
+    """
+
+    def __init__(self, pages: Optional[Dict[str, Revision]] = None,
+                 redirects: Optional[Dict[str, List[str]]] = None,
+                 errors: Optional[Dict[str, str]] = None, rdlimit: Optional[int] = None):
+        self.pages = pages or {}
+        self.redirects = redirects or {}
+        self.errors = errors or {}
+        self.rdlimit = rdlimit
+        self.queries: List[Dict[str, Any]] = []
+        self.posts: List[Dict[str, Any]] = []
+
+    def get(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        self.queries.append(dict(params))
+        requested = params["titles"].split("|")
+        normalized = [{"from": title, "to": title.replace("_", " ")} for title in requested if "_" in title]
+        start = int(params.get("rdcontinue", 0))
+        more = False
+        pages = []
+        for title in (title.replace("_", " ") for title in requested):
+            revision = self.pages.get(title)
+            if revision is None:
+                pages.append({"title": title, "missing": True})
+                continue
+            page = {"title": title, "pageid": revision.pageid}
+            if params["prop"] == "revisions":
+                page["revisions"] = [{"revid": revision.revid, "timestamp": revision.timestamp,
+                                      "content": revision.content}]
+            elif params["prop"] == "info":
+                page["lastrevid"] = revision.revid
+            elif params["prop"] == "redirects":
+                redirects = self.redirects.get(title, [])
+                end = len(redirects) if self.rdlimit is None else start + self.rdlimit
+                more = more or end < len(redirects)
+                page["redirects"] = [{"title": redirect} for redirect in redirects[start:end]]
+            pages.append(page)
+
+        DATA: Dict[str, Any] = {"query": {"normalized": normalized, "pages": pages}}
+        if more:
+            DATA["continue"] = {"rdcontinue": str(start + self.rdlimit), "continue": "||"}
+        return DATA
+
+    def post(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        self.posts.append(dict(data))
+        code = self.errors.get(data.get("title") or data.get("from")) or self.errors.get(data["action"])
+        if code is not None:
+            return {"error": {"code": code, "info": "Refused."}}
+        return {data["action"]: {"result": "Success"}}
+
+    def written(self, action: str) -> List[str]:
+        """Titles of the writes of ``action`` that succeeded, in order."""
+        return [
+            post.get("title") or post.get("from") for post in self.posts
+            if post["action"] == action
+            and (post.get("title") or post.get("from")) not in self.errors and action not in self.errors
+        ]
+
+
+@pytest.fixture
+def wiki_session(monkeypatch):
+    """A FakeWikiSession returned by every get_session(), with an empty wikitext cache."""
+    S = FakeWikiSession()
+    for name in SESSION_MODULES:
+        monkeypatch.setattr(importlib.import_module(name), 'get_session', lambda: S)
+    monkeypatch.setattr(wikitext_cache, '_cache', WikitextCache())
+    return S
+
+
+class FakeResponse:
+    """An interaction response that records what was sent."""
+
+    def __init__(self):
+        self.sent: List[str] = []
+
+    async def defer(self):
+        self.sent.append('defer')
+
+    async def send_modal(self, modal):
+        self.sent.append('modal')
+
+    async def send_message(self, content=None, **kwargs):
+        self.sent.append(content)
+
+    async def edit_message(self, **kwargs):
+        self.sent.append('edit')
+
+
+class FakeFollowup:
+    async def send(self, *args, **kwargs):
+        pass
+
+
+class FakeInteraction:
+    def __init__(self, user_id: int = 0):
+        self.user = SimpleNamespace(id=user_id)
+        self.message = None
+        self.response = FakeResponse()
+        self.followup = FakeFollowup()
+
+
+@pytest.fixture
+def new_interaction():
+    """Make FakeInteractions, optionally for a given user ID."""
+    return FakeInteraction
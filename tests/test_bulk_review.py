@@ -0,0 +1,48 @@
+"""Tests for the batched reads of a bulk review."""
+import pytest
+
+import bulk_review
+from draft_review import draft_title
+from wiki_session import WikiError, requested_titles
+from wikitext_cache import Revision
+
+
+def test_requested_titles():
+    DATA = {"query": {"normalized": [{"from": "User:A/Drafts/B_c", "to": "User:A/Drafts/B c"}]}}
+    assert requested_titles(DATA) == {"User:A/Drafts/B c": "User:A/Drafts/B_c"}
+    assert requested_titles({"query": {}}) == {}
+
+
+def test_draft_title():
+    assert draft_title("A/B") == "User:A/Drafts/B"
+    assert draft_title(" User:A/Drafts/B_c ") == "User:A/Drafts/B c"
+
+
+def test_prefetch_batches_and_keys_by_requested_title(wiki_session):
+    titles = [f"User:A/Drafts/Page_{i}" for i in range(60)] + ["User:A/Drafts/Gone"]
+    for i, title in enumerate(titles[:-1], 1):
+        title = title.replace("_", " ")
+        wiki_session.pages[title] = Revision(i, i * 10, "t", f"Text of {title}")
+        wiki_session.redirects[title] = [f"{title} (redirect)"]
+
+    plan = bulk_review.prefetch(titles)
+    # Two revision queries and two redirect queries for 61 titles
+    assert len(wiki_session.queries) == 4
+    assert plan.missing == ["User:A/Drafts/Gone"]
+    assert plan.revision("User:A/Drafts/Page_0").content == "Text of User:A/Drafts/Page 0"
+    assert plan.redirects["User:A/Drafts/Page_59"] == ["User:A/Drafts/Page 59 (redirect)"]
+    with pytest.raises(WikiError):
+        plan.revision("User:A/Drafts/Gone")
+
+
+def test_approve_draft_raises_when_the_move_fails(wiki_session):
+    title = "User:A/Drafts/Page"
+    wiki_session.pages[title] = Revision(1, 10, "t", "{{review}}Text")
+    wiki_session.redirects[title] = ["Old title"]
+    wiki_session.errors = {"move": "articleexists"}
+
+    plan = bulk_review.prefetch([title])
+    with pytest.raises(WikiError) as error:
+        bulk_review.approve_draft(plan, "A", "Page", None)
+    assert error.value.code == "articleexists"
+    assert [post["action"] for post in wiki_session.posts] == ["edit", "delete", "move"]
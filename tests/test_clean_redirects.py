@@ -0,0 +1,36 @@
+"""Tests for redirect cleanup during approval."""
+import pytest
+
+import clean_redirects
+from wiki_session import WikiError
+from wikitext_cache import Revision
+
+TITLE = "User:Author/Drafts/Name"
+
+
+def test_find_redirects_follows_continuation(wiki_session):
+    wiki_session.pages = {TITLE: Revision(1, 10, "t", "Text")}
+    wiki_session.redirects = {TITLE: [f"Redirect {i}" for i in range(5)]}
+    wiki_session.rdlimit = 2
+
+    redirects = clean_redirects.find_redirects(wiki_session, [TITLE.replace(" ", "_")])
+    assert redirects == {TITLE.replace(" ", "_"): [f"Redirect {i}" for i in range(5)]}
+    assert [query.get("rdcontinue") for query in wiki_session.queries] == [None, "2", "4"]
+
+
+def test_delete_redirects_raises_after_trying_every_title(wiki_session):
+    wiki_session.errors = {"A": "protectedpage"}
+    with pytest.raises(WikiError) as error:
+        clean_redirects.delete_redirects(wiki_session, ["A", "B", "C"])
+    assert error.value.code == "protectedpage"
+    assert sorted(wiki_session.written("delete")) == ["B", "C"]
+
+
+def test_clean_logs_failed_deletions(wiki_session):
+    wiki_session.pages = {TITLE: Revision(1, 10, "t", "Text")}
+    wiki_session.redirects = {TITLE: ["Redirect a", "Redirect b"]}
+    wiki_session.errors = {"Redirect a": "protectedpage"}
+
+    clean_redirects.clean("Author", "Name")
+    assert wiki_session.written("delete") == ["Redirect b"]
+    assert clean_redirects.try_delete_redirects(wiki_session, ["Redirect a"]) is False
@@ -0,0 +1,34 @@
+"""Tests for the single-edit approval of a draft."""
+import pytest
+
+import draft_approve
+from add_category import append_categories
+from wiki_session import WikiError
+from wikitext_cache import Revision
+
+
+def test_append_categories_skips_present_ones():
+    text = "Intro\n[[Category:Bases]]\n[[category: old_builds|sort]]"
+    assert append_categories(text, "bases, Old builds,Maps,  maps ,") == text + "\n\n[[Category:Maps]]"
+    assert append_categories(text, "Bases") == text
+
+
+def test_approve_page_makes_one_edit_against_the_read_revision(wiki_session):
+    revision = Revision(1, 42, "2024-01-01T00:00:00Z", "{{Review}}\nBody")
+
+    draft_approve.approve_page("Author", "Name", "Maps", revision=revision)
+    # The revision was passed in, so nothing is read
+    assert wiki_session.queries == []
+    [edit] = wiki_session.posts
+    assert edit["title"] == "User:Author/Drafts/Name"
+    assert edit["text"] == "\nBody\n\n[[Category:Maps]]"
+    assert (edit["baserevid"], edit["basetimestamp"]) == (42, "2024-01-01T00:00:00Z")
+    assert edit["summary"] == "Approved draft, added categories"
+
+
+def test_approve_page_raises_on_edit_conflict(wiki_session):
+    wiki_session.errors = {"edit": "editconflict"}
+
+    with pytest.raises(WikiError) as error:
+        draft_approve.approve_page("Author", "Name", revision=Revision(1, 42, "ts", "Body"))
+    assert error.value.code == "editconflict"
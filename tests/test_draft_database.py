@@ -0,0 +1,39 @@
+"""Tests for DraftDatabase."""
+import pytest
+
+from draft_database import DraftDatabase
+
+TITLE = "User:Author/Drafts/Name"
+
+
+@pytest.mark.parametrize('cache', [False, True])
+def test_thread_outlives_draft_removal(tmp_path, cache):
+    db = DraftDatabase(str(tmp_path / 'drafts.db'), cache=cache)
+    db.sync_drafts({TITLE: 'url'})
+    db.set_draft_thread(TITLE, 21, 22)
+    # A None message ID keeps the recorded starter message
+    db.set_draft_thread(TITLE, 23, None)
+
+    db.remove_draft(TITLE)
+    assert db.get_draft(TITLE) is None
+
+    # A resubmitted draft gets its old thread back
+    db.sync_drafts({TITLE: 'url'}, removed=())
+    draft = db.get_draft(TITLE)
+    assert (draft.thread_id, draft.message_id) == (23, 22)
+
+
+@pytest.mark.parametrize('cache', [False, True])
+def test_sync_drafts_evicts_and_keeps_created_at(tmp_path, cache):
+    db = DraftDatabase(str(tmp_path / 'drafts.db'), cache=cache)
+    assert db.sync_drafts({'A': 'a', 'B': 'b'}) == ({'A', 'B'}, set())
+    created = db.get_draft('A').created_at
+
+    # A partial sync only removes the titles it is told about
+    assert db.sync_drafts({'A': 'a2', 'C': 'c'}, removed=['B', 'D']) == ({'C'}, {'B'})
+    assert db.get_draft('A').url == 'a2'
+    assert db.get_draft('A').created_at == created
+
+    # A full sync removes everything not listed
+    assert db.sync_drafts({'C': 'c'}) == (set(), {'A'})
+    assert set(db.get_all_drafts()) == {'C'}
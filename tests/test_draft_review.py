@@ -0,0 +1,140 @@
+"""Tests for the draft syncs and the paginated /list view."""
+import asyncio
+
+import pytest
+
+from draft_database import DraftDatabase
+from draft_embeds import EmbedCache
+from draft_review import CATEGORY, DraftListView, draft_link, full_sync, populate_db, sync_changes
+from wiki_client import AsyncWikiClient
+
+
+class FakeWiki:
+    """Answers the calls sync_changes makes from canned recent changes."""
+
+    def __init__(self, changes=(), members=(), listing=(), fail_after=None):
+        self.changes = list(changes)
+        self.members = set(members)
+        self.listing = list(listing)
+        self.fail_after = fail_after
+
+    async def categorymembers(self, category):
+        assert category == CATEGORY
+        for i, pages in enumerate(self.listing):
+            if i == self.fail_after:
+                raise ValueError("truncated response")
+            yield [{'title': title} for title in pages]
+
+    async def latest_change(self):
+        return self.changes[-1] if self.changes else None
+
+    async def recentchanges(self, start):
+        return self.changes
+
+    async def in_category(self, titles, category):
+        assert category == CATEGORY
+        return {title for title in titles if title in self.members}
+
+    async def users(self, usernames):
+        return [{'name': name, 'userid': i} for i, name in enumerate(usernames, 1)]
+
+
+def test_sync_changes_skips_hidden_titles():
+    db = DraftDatabase(':memory:')
+    db.set_state(rc_timestamp='2024-01-01T00:00:00Z', rc_id=1)
+    title = "User:Author/Drafts/Visible"
+    wiki = FakeWiki([
+        {'rcid': 2, 'timestamp': '2024-01-01T00:01:00Z', 'title': title},
+        {'rcid': 3, 'timestamp': '2024-01-01T00:02:00Z'},
+    ], members={title})
+
+    added, removed = asyncio.run(sync_changes(db, wiki))
+    assert added == {title}
+    assert removed == set()
+    # The hidden entry still advances the high-water mark
+    assert db.get_state('rc_id') == '3'
+
+
+def test_populate_db_syncs_and_evicts():
+    db = DraftDatabase(':memory:')
+    db.sync_drafts({"User:A/Drafts/Old": draft_link("User:A/Drafts/Old"),
+                    "User:A/Drafts/Kept": draft_link("User:A/Drafts/Kept")})
+    wiki = FakeWiki(listing=[["User:A/Drafts/Kept"], ["User:B/Drafts/New"]])
+
+    added, removed = asyncio.run(populate_db(db, wiki))
+    assert added == {"User:B/Drafts/New"}
+    assert removed == {"User:A/Drafts/Old"}
+    assert set(db.get_all_drafts()) == {"User:A/Drafts/Kept", "User:B/Drafts/New"}
+
+
+def test_populate_db_failure_changes_nothing():
+    db = DraftDatabase(':memory:')
+    db.sync_drafts({"User:A/Drafts/Old": draft_link("User:A/Drafts/Old")})
+    wiki = FakeWiki(listing=[["User:B/Drafts/New"], ["User:C/Drafts/Other"]], fail_after=1)
+
+    with pytest.raises(ValueError):
+        asyncio.run(populate_db(db, wiki))
+    assert set(db.get_all_drafts()) == {"User:A/Drafts/Old"}
+
+
+def test_latest_change_falls_back_to_server_time():
+    wiki = AsyncWikiClient()
+
+    async def get(params):
+        assert params["curtimestamp"] == "1"
+        return {"curtimestamp": "2024-01-01T00:05:00Z", "query": {"recentchanges": []}}
+    wiki.get = get
+
+    assert asyncio.run(wiki.latest_change()) == {'timestamp': "2024-01-01T00:05:00Z", 'rcid': 0}
+
+
+def test_full_sync_sets_the_high_water_mark():
+    db = DraftDatabase(':memory:')
+    wiki = FakeWiki(changes=[{'rcid': 0, 'timestamp': '2024-01-01T00:05:00Z'}], listing=[["User:A/Drafts/B"]])
+
+    asyncio.run(full_sync(db, wiki))
+    assert db.get_state('rc_timestamp') == '2024-01-01T00:05:00Z'
+    assert db.get_state('rc_id') == '0'
+
+
+def make_db(count: int) -> DraftDatabase:
+    db = DraftDatabase(':memory:')
+    titles = [f"User:Author/Drafts/Draft {i:02d}" for i in range(count)]
+    db.sync_drafts({title: draft_link(title) for title in titles})
+    return db
+
+
+def walk(db: DraftDatabase, presses: list[str], new_interaction) -> list[tuple[int, list[str]]]:
+    """Press the named buttons in turn and record the page shown after each."""
+    async def run():
+        view = DraftListView(db, EmbedCache(), page_size=10)
+        view.load(0)
+        shown = []
+        for press in presses:
+            await getattr(view, press).callback(new_interaction())
+            shown.append((view.page, [entry.title for entry in view.entries]))
+        return shown
+    return asyncio.run(run())
+
+
+def test_last_page_holds_the_remainder(new_interaction):
+    db = make_db(25)
+    [(page, titles)] = walk(db, ['last'], new_interaction)
+    assert page == 2
+    assert titles == [f"User:Author/Drafts/Draft {i:02d}" for i in range(20, 25)]
+
+
+def test_buttons_agree_on_page_contents(new_interaction):
+    db = make_db(25)
+    forward = walk(db, ['first', 'next', 'next'], new_interaction)
+    backward = walk(db, ['last', 'previous', 'previous'], new_interaction)
+    assert forward == backward[::-1]
+    # Going forward again from a page reached backwards lands on the same pages
+    assert walk(db, ['last', 'previous', 'next'], new_interaction) == [forward[2], forward[1], forward[2]]
+
+
+def test_full_last_page(new_interaction):
+    db = make_db(20)
+    [(page, titles)] = walk(db, ['last'], new_interaction)
+    assert page == 1
+    assert len(titles) == 10
@@ -0,0 +1,96 @@
+"""Tests for vote tallies and status transitions."""
+import asyncio
+import time
+from types import SimpleNamespace
+
+from draft_database import DraftDatabase
+from draft_vote import DraftVote, VoteView
+
+
+class FakeDraftBot:
+    def __init__(self, error=None):
+        self.error = error
+        self.approved = []
+
+    async def approve(self, author, name, categories):
+        if self.error:
+            raise self.error
+        self.approved.append((author, name, categories))
+
+
+def open_vote(db: DraftDatabase, required_votes: int = 2, end_time: int = None) -> int:
+    return db.create_vote("Author", "Name", required_votes, end_time or int(time.time()) + 3600)
+
+
+def click(db: DraftDatabase, vote_id: int, interaction, approve: bool) -> list:
+    async def run():
+        view = VoteView(SimpleNamespace(db=db), db.get_vote(vote_id))
+        await view._handle_vote(interaction, approve)
+        return interaction.response.sent
+    return asyncio.run(run())
+
+
+def test_ballots_are_one_per_voter():
+    db = DraftDatabase(':memory:')
+    vote_id = open_vote(db)
+    assert db.cast_ballot(vote_id, 1, True) == (1, 0)
+    assert db.cast_ballot(vote_id, 1, True) == (1, 0)
+    assert db.cast_ballot(vote_id, 1, False) == (0, 1)
+    assert db.cast_ballot(vote_id, 2, True) == (1, 1)
+    vote = db.get_vote(vote_id)
+    assert (vote.approvals, vote.rejections) == (1, 1)
+
+
+def test_transition_vote_only_from_expected_status():
+    db = DraftDatabase(':memory:')
+    vote_id = open_vote(db)
+    assert db.transition_vote(vote_id, ['open'], 'approved')
+    assert not db.transition_vote(vote_id, ['open'], 'rejected')
+    assert db.get_vote(vote_id).status == 'approved'
+    assert [vote.vote_id for vote in db.get_votes(['approved'])] == [vote_id]
+
+
+def test_threshold_decides_the_vote(new_interaction):
+    db = DraftDatabase(':memory:')
+    vote_id = open_vote(db)
+    assert click(db, vote_id, new_interaction(1), True) == ['defer']
+    assert db.get_vote(vote_id).status == 'open'
+    assert click(db, vote_id, new_interaction(2), True) == ['modal']
+    assert db.get_vote(vote_id).status == 'approved'
+    # Until the modal is submitted, any click reopens it
+    assert click(db, vote_id, new_interaction(3), False) == ['modal']
+    assert db.get_vote(vote_id).rejections == 0
+
+
+def test_expired_vote_takes_no_ballots(new_interaction):
+    db = DraftDatabase(':memory:')
+    vote_id = open_vote(db, end_time=int(time.time()) - 1)
+    assert click(db, vote_id, new_interaction(1), True) == ["This vote has ended."]
+    assert db.get_vote(vote_id).approvals == 0
+
+
+def finish(db: DraftDatabase, vote_id: int, draft_bot: FakeDraftBot, interaction) -> None:
+    async def run():
+        cog = SimpleNamespace(db=db, bot=SimpleNamespace(get_cog=lambda name: draft_bot))
+        view = VoteView(cog, db.get_vote(vote_id))
+        await DraftVote.finish_vote(cog, view, True, "Maps", interaction)
+    asyncio.run(run())
+
+
+def test_finish_vote_completes_once(new_interaction):
+    db = DraftDatabase(':memory:')
+    vote_id = open_vote(db)
+    db.transition_vote(vote_id, ['open'], 'approved')
+    draft_bot = FakeDraftBot()
+    finish(db, vote_id, draft_bot, new_interaction())
+    finish(db, vote_id, draft_bot, new_interaction())
+    assert draft_bot.approved == [("Author", "Name", "Maps")]
+    assert db.get_vote(vote_id).status == 'completed'
+
+
+def test_failed_pipeline_can_be_retried(new_interaction):
+    db = DraftDatabase(':memory:')
+    vote_id = open_vote(db)
+    db.transition_vote(vote_id, ['open'], 'approved')
+    finish(db, vote_id, FakeDraftBot(error=RuntimeError("wiki down")), new_interaction())
+    assert db.get_vote(vote_id).status == 'approved'
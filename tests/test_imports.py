@@ -0,0 +1,40 @@
+"""Smoke tests: every module imports and both cogs load into a bot."""
+import asyncio
+import importlib
+
+import pytest
+
+MODULES = [
+    'add_category', 'bot_logging', 'bulk_review', 'clean_redirects', 'draft_approve',
+    'draft_database', 'draft_deny', 'draft_embeds', 'draft_move', 'draft_review', 'draft_vote',
+    'metrics', 'page_move', 'rate_limit', 'thread_registry', 'wiki_client', 'wiki_session',
+    'wikitext_cache'
+]
+
+
+@pytest.mark.parametrize('module', MODULES)
+def test_import(module):
+    importlib.import_module(module)
+
+
+def test_cogs_load(tmp_path, monkeypatch):
+    import discord
+    from discord.ext import commands
+
+    monkeypatch.setenv('DATABASE_PATH', str(tmp_path / 'drafts.db'))
+    monkeypatch.setenv('DRAFT_DB_PATH', str(tmp_path / 'drafts.db'))
+
+    async def load():
+        bot = commands.Bot(command_prefix='~', help_command=None, intents=discord.Intents.default())
+        bot.load_extension('draft_review')
+        bot.load_extension('draft_vote')
+        assert bot.get_cog('DraftBot') is not None
+        assert bot.get_cog('DraftVote') is not None
+        names = {command.name for command in bot.pending_application_commands}
+        assert {'list', 'bulk', 'metrics', 'vote'} <= names
+        for cog in ('DraftBot', 'DraftVote'):
+            bot.remove_cog(cog)
+        await asyncio.sleep(0)
+        await bot.close()
+
+    asyncio.run(load())
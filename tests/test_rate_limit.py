@@ -0,0 +1,80 @@
+"""Tests for the wiki rate limiter."""
+import pytest
+
+import rate_limit
+from rate_limit import RateLimiter, TokenBucket, parse_retry_after, throttle_reason
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limit.time, 'monotonic', clock)
+    return clock
+
+
+def test_bucket_allows_a_burst_then_spaces_requests(clock):
+    bucket = TokenBucket(rate=2.0, burst=2)
+    assert [bucket.reserve() for _ in range(4)] == [0.0, 0.0, 0.5, 1.0]
+    clock.now += 1.0
+    assert bucket.reserve() == pytest.approx(0.5)
+
+
+def test_pause_halves_the_rate_and_success_restores_it(clock):
+    bucket = TokenBucket(rate=4.0, burst=1, min_rate=1.0)
+    bucket.pause(2.0)
+    assert bucket.rate == 2.0
+    # Throttles reported during the pause do not slow us down again
+    bucket.pause(1.0)
+    assert bucket.rate == 2.0
+    assert bucket.reserve() == pytest.approx(2.0 + 0.5)
+
+    clock.now += 10
+    for _ in range(3):
+        bucket.pause(0)
+        clock.now += 1
+    assert bucket.rate == 1.0
+
+    for _ in range(100):
+        bucket.succeeded()
+    assert bucket.rate == 4.0
+
+
+def test_ratelimited_only_pauses_its_own_bucket(clock):
+    limiter = RateLimiter(read_rate=5.0, write_rate=1.0)
+    assert limiter.throttled(True, 'ratelimited', 0, retry_after='3') == 3.0
+    assert limiter.write.rate == 0.5
+    assert limiter.read.rate == 5.0
+
+    limiter.throttled(False, 'maxlag', 0, retry_after='3')
+    assert limiter.read.rate == 2.5
+    assert limiter.write.updated == pytest.approx(clock.now + 3)
+
+
+def test_backoff_is_capped():
+    limiter = RateLimiter(base_delay=1.0, max_delay=10.0)
+    assert 4.0 <= limiter.backoff(3) <= 8.0
+    assert 5.0 <= limiter.backoff(20) <= 10.0
+    assert limiter.backoff(0, retry_after=60) == 10.0
+
+
+def test_throttle_reason():
+    assert throttle_reason(429, None) == '429'
+    assert throttle_reason(200, {'error': {'code': 'maxlag'}}) == 'maxlag'
+    assert throttle_reason(200, {'error': {'code': 'badtoken'}}) is None
+    assert throttle_reason(200, ['not', 'a', 'dict']) is None
+
+
+def test_parse_retry_after():
+    assert parse_retry_after('7') == 7.0
+    assert parse_retry_after('-1') == 0.0
+    assert parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT') == 0.0
+    assert parse_retry_after('soon') is None
+    assert parse_retry_after(None) is None
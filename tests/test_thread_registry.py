@@ -0,0 +1,61 @@
+"""Tests for the bounded draft thread registry."""
+from types import SimpleNamespace
+
+from thread_registry import ThreadRegistry
+
+CHANNEL = 1
+
+
+def thread(thread_id: int, name: str, archived: bool = False, parent_id: int = CHANNEL):
+    return SimpleNamespace(id=thread_id, name=f"Draft: {name}", archived=archived, parent_id=parent_id)
+
+
+def test_oldest_archived_threads_are_evicted():
+    registry = ThreadRegistry(CHANNEL, max_archived=3)
+    registry.update(thread(i, f"Active {i}") for i in range(5))
+    registry.update(thread(100 + i, f"Archived {i}", archived=True) for i in range(5))
+
+    assert len(registry) == 8
+    assert all(f"Active {i}" in registry for i in range(5))
+    assert [name for name in (f"Archived {i}" for i in range(5)) if name in registry] == \
+        ["Archived 2", "Archived 3", "Archived 4"]
+    # An evicted thread's ID is forgotten too
+    registry.remove(100)
+    assert len(registry) == 8
+
+
+def test_rearchiving_refreshes_eviction_order():
+    registry = ThreadRegistry(CHANNEL, max_archived=2)
+    registry.add(thread(1, "A", archived=True))
+    registry.add(thread(2, "B", archived=True))
+    registry.add(thread(1, "A", archived=False))
+    registry.add(thread(1, "A", archived=True))
+    registry.add(thread(3, "C", archived=True))
+    assert "A" in registry and "C" in registry and "B" not in registry
+
+
+def test_unarchived_thread_is_not_evicted():
+    registry = ThreadRegistry(CHANNEL, max_archived=1)
+    registry.add(thread(1, "A", archived=True))
+    registry.add(thread(1, "A", archived=False))
+    registry.add(thread(2, "B", archived=True))
+    registry.add(thread(3, "C", archived=True))
+    assert "A" in registry and "C" in registry and "B" not in registry
+
+
+def test_renamed_thread_is_filed_under_its_new_name():
+    registry = ThreadRegistry(CHANNEL)
+    registry.add(thread(1, "Old"))
+    registry.add(thread(1, "New"))
+    assert "Old" not in registry
+    assert registry.get("New").id == 1
+
+    registry.remove(1)
+    assert len(registry) == 0
+
+
+def test_other_threads_are_ignored():
+    registry = ThreadRegistry(CHANNEL)
+    registry.add(thread(1, "A", parent_id=2))
+    registry.add(SimpleNamespace(id=2, name="General chat", archived=False, parent_id=CHANNEL))
+    assert len(registry) == 0
@@ -0,0 +1,79 @@
+"""Tests for the shared, logged-in wiki session."""
+import pytest
+
+from rate_limit import RateLimiter
+from wiki_session import WikiError, WikiSession
+
+
+class FakeHTTPResponse:
+    def __init__(self, data):
+        self.data = data
+        self.ok = True
+        self.status_code = 200
+        self.headers = {}
+
+    def json(self):
+        return self.data
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeHTTPSession:
+    """Plays the wiki's login flow and rejects the first ``rejections`` writes."""
+
+    def __init__(self, rejections=1, code='badtoken'):
+        self.rejections = rejections
+        self.code = code
+        self.logins = 0
+        self.writes = []
+        self.tokens = 0
+
+    def get(self, url, params, timeout):
+        if params.get('type') == 'login':
+            return FakeHTTPResponse({'query': {'tokens': {'logintoken': 'login+\\'}}})
+        self.tokens += 1
+        return FakeHTTPResponse({'query': {'tokens': {'csrftoken': f"token{self.tokens}+\\"}}})
+
+    def post(self, url, data, timeout):
+        if data['action'] == 'login':
+            self.logins += 1
+            return FakeHTTPResponse({'login': {'result': 'Success'}})
+        self.writes.append(data['token'])
+        if len(self.writes) <= self.rejections:
+            return FakeHTTPResponse({'error': {'code': self.code, 'info': 'Rejected.'}})
+        return FakeHTTPResponse({'edit': {'result': 'Success'}})
+
+
+def make_session(http: FakeHTTPSession) -> WikiSession:
+    S = WikiSession(password='secret', limiter=RateLimiter(read_rate=1000, write_rate=1000))
+    S.session = http
+    return S
+
+
+def test_login_is_reused_across_writes():
+    http = FakeHTTPSession(rejections=0)
+    S = make_session(http)
+    S.post({'action': 'edit', 'title': 'A'})
+    S.post({'action': 'edit', 'title': 'B'})
+    assert http.logins == 1
+    assert http.writes == ['token1+\\', 'token1+\\']
+
+
+@pytest.mark.parametrize('code', ['badtoken', 'assertuserfailed'])
+def test_rejected_token_logs_in_again_and_retries_once(code):
+    http = FakeHTTPSession(rejections=1, code=code)
+    S = make_session(http)
+    assert S.post({'action': 'edit', 'title': 'A'}) == {'edit': {'result': 'Success'}}
+    assert http.logins == 2
+    assert http.writes == ['token1+\\', 'token2+\\']
+
+
+def test_second_rejection_raises():
+    http = FakeHTTPSession(rejections=2)
+    S = make_session(http)
+    with pytest.raises(WikiError) as error:
+        S.post({'action': 'edit', 'title': 'A'})
+    assert error.value.code == 'badtoken'
+    assert http.logins == 2
+    assert len(http.writes) == 2
@@ -0,0 +1,47 @@
+"""Tests for the revision-keyed wikitext cache."""
+import zlib
+
+from wikitext_cache import Revision, WikitextCache, latest_revision, remember_edit
+
+
+def test_put_replaces_older_revisions_of_a_page():
+    cache = WikitextCache()
+    cache.put("A", Revision(1, 10, "t1", "old"))
+    cache.put("A", Revision(1, 11, "t2", "new"))
+    assert len(cache) == 1
+    assert cache.get(1, 10) is None
+    assert cache.get(1, 11).content == "new"
+
+
+def test_least_recently_used_is_evicted():
+    text = "x" * 100
+    size = len(zlib.compress(text.encode('utf-8')))
+    cache = WikitextCache(max_bytes=2 * size)
+    cache.put("A", Revision(1, 10, "t", text))
+    cache.put("B", Revision(2, 20, "t", text))
+    cache.get(1, 10)
+    cache.put("C", Revision(3, 30, "t", text))
+    assert cache.get(2, 20) is None
+    assert cache.known("A") and cache.known("C") and not cache.known("B")
+    assert cache.size == 2 * size
+
+
+def test_latest_revision_downloads_only_changed_text(wiki_session):
+    cache = WikitextCache()
+    wiki_session.pages["A"] = Revision(1, 10, "t1", "first")
+    assert latest_revision(wiki_session, "A", cache).content == "first"
+    assert latest_revision(wiki_session, "A", cache).content == "first"
+    wiki_session.pages["A"] = Revision(1, 11, "t2", "second")
+    assert latest_revision(wiki_session, "A", cache).content == "second"
+    assert [query["prop"] for query in wiki_session.queries] == ["revisions", "info", "info", "revisions"]
+
+
+def test_remember_edit_skips_pre_save_transforms():
+    cache = WikitextCache()
+    saved = {"edit": {"result": "Success", "pageid": 1, "newrevid": 12, "newtimestamp": "t"}}
+    remember_edit("A", "Signed ~~~~", saved, cache)
+    assert len(cache) == 0
+    remember_edit("A", "Body\n\n", saved, cache)
+    assert cache.get(1, 12).content == "Body"
+    remember_edit("A", "Body", {"edit": {"result": "Success", "nochange": ""}}, cache)
+    assert len(cache) == 1
@@ -0,0 +1,87 @@
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+
+import discord
+
+THREAD_PREFIX = 'Draft: '
+
+
+class ThreadRegistry:
+    """Draft review threads of one channel, keyed by draft name.
+
+    Kept up to date from thread create/update/delete gateway events, so a
+    lookup never has to page through the channel's archived threads. Only the
+    most recently archived ``max_archived`` threads are remembered; older ones
+    are evicted oldest first.
+    """
+
+    def __init__(self, channel_id: int, max_archived: int = 500):
+        self.channel_id = channel_id
+        self.max_archived = max_archived
+        self._threads: Dict[str, discord.Thread] = {}
+        self._names: Dict[int, str] = {}
+        # Names of archived threads, least recently archived first
+        self._archived: "OrderedDict[str, None]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._threads)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._threads
+
+    @staticmethod
+    def draft_name(thread_name: str) -> Optional[str]:
+        """Get the draft name from a thread name, or None if it is not a draft thread."""
+        if thread_name.startswith(THREAD_PREFIX):
+            return thread_name[len(THREAD_PREFIX):]
+        return None
+
+    def get(self, name: str) -> Optional[discord.Thread]:
+        """Get the thread for a draft."""
+        return self._threads.get(name)
+
+    def add(self, thread: discord.Thread) -> None:
+        """Register or refresh a thread. Threads of other channels are ignored."""
+        if thread.parent_id != self.channel_id:
+            return
+        name = self.draft_name(thread.name)
+        if name is None:
+            return
+
+        # The thread may have been renamed since we last saw it
+        old_name = self._names.get(thread.id)
+        if old_name is not None and old_name != name:
+            self._discard(old_name)
+
+        self._threads[name] = thread
+        self._names[thread.id] = name
+        if thread.archived:
+            self._archived[name] = None
+            self._archived.move_to_end(name)
+            self._evict()
+        else:
+            self._archived.pop(name, None)
+
+    def update(self, threads: Iterable[discord.Thread]) -> None:
+        """Register several threads."""
+        for thread in threads:
+            self.add(thread)
+
+    def remove(self, thread_id: int) -> None:
+        """Forget a deleted thread."""
+        name = self._names.get(thread_id)
+        if name is not None:
+            self._discard(name)
+
+    def _discard(self, name: str) -> None:
+        thread = self._threads.pop(name, None)
+        if thread is not None:
+            self._names.pop(thread.id, None)
+        self._archived.pop(name, None)
+
+    def _evict(self) -> None:
+        while len(self._archived) > self.max_archived:
+            name, _ = self._archived.popitem(last=False)
+            thread = self._threads.pop(name, None)
+            if thread is not None:
+                self._names.pop(thread.id, None)
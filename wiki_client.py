@@ -0,0 +1,315 @@
+import asyncio
+import logging
+from os import environ
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
+
+import aiohttp
+from dotenv import load_dotenv
+
+from bot_logging import log_event
+from metrics import WIKI_ERRORS, WIKI_REQUEST_SECONDS, WIKI_THROTTLED, api_action
+from rate_limit import RateLimiter, get_limiter, throttle_reason
+from wiki_session import URL, USER_AGENT, BOT_USERNAME, REAUTH_CODES, WikiError
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncWikiClient:
+    """Non-blocking MediaWiki API client for use on the bot's event loop.
+
+    Mirrors WikiSession: one pooled aiohttp session, a single login and a
+    cached CSRF token that is refreshed on REAUTH_CODES. Requests share the
+    RateLimiter of the sync session. The aiohttp session is created lazily so
+    the client can be constructed outside a running event loop.
+    """
+
+    def __init__(self, url: str = URL, username: str = BOT_USERNAME,
+                 password: Optional[str] = None, pool_size: int = 10,
+                 timeout: float = 30, limiter: Optional[RateLimiter] = None):
+        self.url = url
+        self.username = username
+        self._password = password
+        self.limiter = limiter or get_limiter()
+        self._pool_size = pool_size
+        self._timeout = aiohttp.ClientTimeout(total=timeout)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._csrf_token: Optional[str] = None
+        self._login_lock: Optional[asyncio.Lock] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                headers={'User-Agent': USER_AGENT},
+                connector=aiohttp.TCPConnector(limit=self._pool_size),
+                timeout=self._timeout
+            )
+            self._login_lock = asyncio.Lock()
+        return self._session
+
+    async def close(self) -> None:
+        """Close the underlying HTTP session."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._csrf_token = None
+
+    async def _request(self, method: str, params: Dict[str, Any], write: bool = False) -> Dict[str, Any]:
+        """Send one API request within the rate limits; see WikiSession._request."""
+        session = self._get_session()
+        action = api_action(params)
+        params = {**params, "format": "json"}
+        if write and self.limiter.maxlag is not None:
+            params["maxlag"] = self.limiter.maxlag
+
+        for attempt in range(self.limiter.max_retries + 1):
+            await asyncio.sleep(self.limiter.reserve(write))
+            with WIKI_REQUEST_SECONDS.time(WIKI_ERRORS, action=action):
+                if method == 'GET':
+                    request = session.get(self.url, params=params)
+                else:
+                    request = session.post(self.url, data=params)
+                async with request as R:
+                    DATA = await R.json(content_type=None) if R.ok else None
+                    retry_after = R.headers.get('Retry-After')
+
+            reason = throttle_reason(R.status, DATA)
+            if reason is not None and attempt < self.limiter.max_retries:
+                delay = self.limiter.throttled(write, reason, attempt, retry_after)
+                WIKI_THROTTLED.inc(action=action, reason=reason)
+                logger.warning(f"Wiki throttled {action} ({reason}), retrying in {delay:.1f}s")
+                continue
+            R.raise_for_status()
+            if reason is None:
+                self.limiter.succeeded(write)
+            return DATA
+
+    async def get(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Send a read request and return the decoded JSON response."""
+        return await self._request('GET', params)
+
+    async def _post_raw(self, data: Dict[str, Any], write: bool = False) -> Dict[str, Any]:
+        return await self._request('POST', data, write)
+
+    async def login(self) -> str:
+        """Log in with the bot password and return a fresh CSRF token."""
+        self._get_session()
+        async with self._login_lock:
+            return await self._login()
+
+    async def _login(self) -> str:
+        DATA = await self.get({
+            "action": "query",
+            "meta": "tokens",
+            "type": "login"
+        })
+        LOGIN_TOKEN = DATA['query']['tokens']['logintoken']
+
+        DATA = await self._post_raw({
+            "action": "login",
+            "lgname": self.username,
+            "lgpassword": self._password or environ['2b2tWikiBotPassword'],
+            "lgtoken": LOGIN_TOKEN
+        })
+        result = DATA.get('login', {})
+        if result.get('result') != 'Success':
+            raise WikiError('loginfailed', result.get('reason', str(result)))
+
+        DATA = await self.get({
+            "action": "query",
+            "meta": "tokens"
+        })
+        self._csrf_token = DATA['query']['tokens']['csrftoken']
+        logger.info(f"Logged in to {self.url} as {self.username}")
+        return self._csrf_token
+
+    async def csrf_token(self) -> str:
+        """Return the cached CSRF token, logging in first if needed."""
+        self._get_session()
+        async with self._login_lock:
+            if self._csrf_token is None:
+                return await self._login()
+            return self._csrf_token
+
+    async def post(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Send a write request signed with the cached CSRF token.
+
+        Retries once after logging in again if the token was rejected, and
+        raises WikiError if the retry is rejected too.
+        """
+        for attempt in range(2):
+            token = await self.csrf_token()
+            DATA = await self._post_raw({**data, "assert": "user", "token": token}, write=True)
+
+            code = DATA.get('error', {}).get('code')
+            if code is not None:
+                WIKI_ERRORS.inc(action=api_action(data))
+            if code in REAUTH_CODES and attempt == 0:
+                logger.warning(f"Wiki session expired ({code}), logging in again")
+                if self._csrf_token == token:
+                    self._csrf_token = None
+                continue
+            log_event('wiki_action', action=data.get('action'),
+                      title=data.get('title') or data.get('from'),
+                      error=DATA.get('error', {}).get('code'))
+            if code in REAUTH_CODES:
+                # Rejected again straight after a fresh login; retrying will not help
+                raise WikiError(code, DATA['error'].get('info', ''))
+            return DATA
+
+    async def categorymembers(self, category: str,
+                              limit: str = "max") -> AsyncIterator[List[Dict[str, Any]]]:
+        """Yield the members of a category one API page at a time.
+
+        Follows ``cmcontinue`` until the listing is exhausted. ``max`` lets
+        the wiki pick the largest page size the account is allowed (5000 for
+        bots, 500 otherwise).
+        """
+        params = {
+            "action": "query",
+            "list": "categorymembers",
+            "cmtitle": category,
+            "cmlimit": limit
+        }
+        while True:
+            DATA = await self.get(params)
+            if 'query' not in DATA or 'categorymembers' not in DATA['query']:
+                raise WikiError('badresponse', f"Unexpected categorymembers response: {DATA}")
+            yield DATA['query']['categorymembers']
+            if 'continue' not in DATA:
+                return
+            params.update(DATA['continue'])
+
+    async def recentchanges(self, start: Optional[str], namespace: str = "2",
+                            types: str = "new|edit|log") -> List[Dict[str, Any]]:
+        """List recent changes from ``start`` onwards, oldest first.
+
+        Follows ``rccontinue`` so every change since ``start`` is returned;
+        the cost scales with the number of changes, not the size of the wiki.
+        """
+        params = {
+            "action": "query",
+            "list": "recentchanges",
+            "rcnamespace": namespace,
+            "rctype": types,
+            "rcprop": "title|timestamp|ids|loginfo",
+            "rcdir": "newer",
+            "rclimit": "max",
+            "formatversion": "2"
+        }
+        if start:
+            params["rcstart"] = start
+
+        changes = []
+        while True:
+            DATA = await self.get(params)
+            if 'query' not in DATA:
+                raise WikiError('badresponse', f"Unexpected recentchanges response: {DATA}")
+            changes.extend(DATA['query']['recentchanges'])
+            if 'continue' not in DATA:
+                return changes
+            params.update(DATA['continue'])
+
+    async def latest_change(self) -> Optional[Dict[str, Any]]:
+        """Return the newest entry in recent changes.
+
+        If recent changes is empty, returns the server's current time with an
+        rcid of 0, so the caller still gets a high-water mark to poll from.
+        """
+        DATA = await self.get({
+            "action": "query",
+            "list": "recentchanges",
+            "rcprop": "timestamp|ids",
+            "rcdir": "older",
+            "rclimit": "1",
+            "curtimestamp": "1",
+            "formatversion": "2"
+        })
+        changes = DATA.get('query', {}).get('recentchanges', [])
+        if changes:
+            return changes[0]
+        if 'curtimestamp' in DATA:
+            return {'timestamp': DATA['curtimestamp'], 'rcid': 0}
+        return None
+
+    async def in_category(self, titles: List[str], category: str) -> Set[str]:
+        """Return the subset of ``titles`` that are members of ``category``."""
+        members = set()
+        for i in range(0, len(titles), 50):
+            params = {
+                "action": "query",
+                "prop": "categories",
+                "clcategories": category,
+                "cllimit": "max",
+                "titles": "|".join(titles[i:i + 50]),
+                "formatversion": "2"
+            }
+            # cllimit applies to the whole batch, so follow clcontinue
+            while True:
+                DATA = await self.get(params)
+                for page in DATA.get('query', {}).get('pages', []):
+                    if page.get('categories'):
+                        members.add(page['title'])
+                if 'continue' not in DATA:
+                    break
+                params.update(DATA['continue'])
+        return members
+
+    async def users(self, usernames: List[str]) -> List[Dict[str, Any]]:
+        """Look up users by name. At most 50 names may be passed at once."""
+        DATA = await self.get({
+            "action": "query",
+            "list": "users",
+            "ususers": "|".join(usernames)
+        })
+        if 'query' not in DATA or 'users' not in DATA['query']:
+            raise WikiError('badresponse', f"Unexpected users response: {DATA}")
+        return DATA['query']['users']
+
+    async def revisions(self, titles: List[str]) -> List[Dict[str, Any]]:
+        """Fetch the latest revision content of each page."""
+        DATA = await self.get({
+            "action": "query",
+            "prop": "revisions",
+            "titles": "|".join(titles),
+            "rvprop": "content|ids|timestamp",
+            "formatversion": "2"
+        })
+        return DATA["query"]["pages"]
+
+    async def edit(self, title: str, text: str, summary: str, **extra: Any) -> Dict[str, Any]:
+        """Replace the text of a page."""
+        return await self.post({
+            "action": "edit",
+            "title": title,
+            "bot": "1",
+            "text": text,
+            "summary": summary,
+            **extra
+        })
+
+    async def move(self, from_title: str, to_title: str, reason: str,
+                   movetalk: bool = True, noredirect: bool = False) -> Dict[str, Any]:
+        """Move a page to a new title."""
+        data = {
+            "action": "move",
+            "from": from_title,
+            "to": to_title,
+            "reason": reason
+        }
+        if movetalk:
+            data["movetalk"] = "1"
+        if noredirect:
+            data["noredirect"] = "1"
+        return await self.post(data)
+
+    async def delete(self, title: str, reason: Optional[str] = None) -> Dict[str, Any]:
+        """Delete a page."""
+        data = {
+            "action": "delete",
+            "title": title
+        }
+        if reason:
+            data["reason"] = reason
+        return await self.post(data)
@@ -0,0 +1,197 @@
+import threading
+import time
+import logging
+from os import environ
+from typing import Any, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+
+from bot_logging import log_event
+from metrics import WIKI_ERRORS, WIKI_REQUEST_SECONDS, WIKI_THROTTLED, api_action
+from rate_limit import RateLimiter, get_limiter, throttle_reason
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Overridable so the bot can be pointed at a local stand-in (see benchmarks/load_harness.py)
+URL = environ.get('WIKI_API_URL', "https://2b2t.miraheze.org/w/api.php")
+
+USER_AGENT = '2b2tWikiBot/2.0 (Miraheze; 2b2t Wiki) Draft Review Bot'
+
+# Use of main account for login is not supported. Obtain credentials via
+# Special:BotPasswords (https://www.mediawiki.org/wiki/Special:BotPasswords)
+BOT_USERNAME = "2b2tWikiBot@2b2tWikiBot"
+
+# API error codes meaning the login or CSRF token has expired
+REAUTH_CODES = {"badtoken", "assertuserfailed", "assertbotfailed", "notloggedin"}
+
+
+class WikiError(Exception):
+    """Raised when the MediaWiki API rejects a request."""
+
+    def __init__(self, code: str, info: str = ""):
+        super().__init__(f"{code}: {info}")
+        self.code = code
+        self.info = info
+
+
+class WikiSession:
+    """A logged-in MediaWiki API client shared by every wiki write.
+
+    Logs in once, caches the CSRF token and keeps the HTTP connections
+    alive between calls. The token is only refreshed when the API answers
+    a write with one of REAUTH_CODES. Requests are paced by the shared
+    RateLimiter and retried when the wiki throttles them.
+    """
+
+    def __init__(self, url: str = URL, username: str = BOT_USERNAME,
+                 password: Optional[str] = None, pool_size: int = 10,
+                 limiter: Optional[RateLimiter] = None):
+        self.url = url
+        self.username = username
+        self._password = password
+        self.limiter = limiter or get_limiter()
+        self._csrf_token: Optional[str] = None
+        self._lock = threading.Lock()
+
+        self.session = requests.Session()
+        self.session.headers['User-Agent'] = USER_AGENT
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def _request(self, method: str, params: Dict[str, Any], write: bool = False) -> Dict[str, Any]:
+        """Send one API request within the rate limits and return the decoded JSON.
+
+        Writes carry maxlag. Throttled responses (HTTP 429/503, ratelimited,
+        maxlag) are retried after Retry-After or a jittered exponential
+        backoff; after the last retry the response is returned or raised.
+        """
+        action = api_action(params)
+        params = {**params, "format": "json"}
+        if write and self.limiter.maxlag is not None:
+            params["maxlag"] = self.limiter.maxlag
+
+        for attempt in range(self.limiter.max_retries + 1):
+            time.sleep(self.limiter.reserve(write))
+            with WIKI_REQUEST_SECONDS.time(WIKI_ERRORS, action=action):
+                if method == 'GET':
+                    R = self.session.get(url=self.url, params=params, timeout=30)
+                else:
+                    R = self.session.post(self.url, data=params, timeout=60)
+                DATA = R.json() if R.ok else None
+
+            reason = throttle_reason(R.status_code, DATA)
+            if reason is not None and attempt < self.limiter.max_retries:
+                delay = self.limiter.throttled(write, reason, attempt, R.headers.get('Retry-After'))
+                WIKI_THROTTLED.inc(action=action, reason=reason)
+                logger.warning(f"Wiki throttled {action} ({reason}), retrying in {delay:.1f}s")
+                continue
+            R.raise_for_status()
+            if reason is None:
+                self.limiter.succeeded(write)
+            return DATA
+
+    def get(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Send a read request and return the decoded JSON response."""
+        return self._request('GET', params)
+
+    def login(self) -> str:
+        """Log in with the bot password and return a fresh CSRF token."""
+        with self._lock:
+            return self._login()
+
+    def _login(self) -> str:
+        # Step 1: GET request to fetch login token
+        DATA = self.get({
+            "action": "query",
+            "meta": "tokens",
+            "type": "login"
+        })
+        LOGIN_TOKEN = DATA['query']['tokens']['logintoken']
+
+        # Step 2: POST request to log in
+        DATA = self._request('POST', {
+            "action": "login",
+            "lgname": self.username,
+            "lgpassword": self._password or environ['2b2tWikiBotPassword'],
+            "lgtoken": LOGIN_TOKEN
+        })
+        result = DATA.get('login', {})
+        if result.get('result') != 'Success':
+            raise WikiError('loginfailed', result.get('reason', str(result)))
+
+        # Step 3: GET request to fetch CSRF token
+        DATA = self.get({
+            "action": "query",
+            "meta": "tokens"
+        })
+        self._csrf_token = DATA['query']['tokens']['csrftoken']
+        logger.info(f"Logged in to {self.url} as {self.username}")
+        return self._csrf_token
+
+    def csrf_token(self) -> str:
+        """Return the cached CSRF token, logging in first if needed."""
+        with self._lock:
+            if self._csrf_token is None:
+                return self._login()
+            return self._csrf_token
+
+    def _invalidate(self, stale_token: str) -> None:
+        """Forget a rejected token unless another thread already replaced it."""
+        with self._lock:
+            if self._csrf_token == stale_token:
+                self._csrf_token = None
+
+    def post(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Send a write request signed with the cached CSRF token.
+
+        The request asserts that we are still logged in, so an expired
+        session is reported as an error instead of an anonymous edit. On
+        such an error we log in again and retry once; if the retry is
+        rejected as well, WikiError is raised.
+        """
+        action = api_action(data)
+        for attempt in range(2):
+            token = self.csrf_token()
+            DATA = self._request('POST', {
+                **data,
+                "assert": "user",
+                "token": token
+            }, write=True)
+
+            code = DATA.get('error', {}).get('code')
+            if code is not None:
+                WIKI_ERRORS.inc(action=action)
+            if code in REAUTH_CODES and attempt == 0:
+                logger.warning(f"Wiki session expired ({code}), logging in again")
+                self._invalidate(token)
+                continue
+            log_event('wiki_action', action=data.get('action'),
+                      title=data.get('title') or data.get('from'),
+                      error=DATA.get('error', {}).get('code'))
+            if code in REAUTH_CODES:
+                # Rejected again straight after a fresh login; retrying will not help
+                raise WikiError(code, DATA['error'].get('info', ''))
+            return DATA
+
+
+def requested_titles(DATA: Dict[str, Any]) -> Dict[str, str]:
+    """Map each title the API normalised in a query back to the title we sent."""
+    return {entry["to"]: entry["from"] for entry in DATA.get("query", {}).get("normalized", [])}
+
+
+_session: Optional[WikiSession] = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> WikiSession:
+    """Return the process-wide WikiSession, creating it on first use."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = WikiSession()
+        return _session
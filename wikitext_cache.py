@@ -0,0 +1,158 @@
+import re
+import threading
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from os import environ
+from typing import Any, Dict, Optional, Tuple
+
+from metrics import WIKITEXT_CACHE
+from wiki_session import WikiError, WikiSession
+
+# Wikitext the pre-save transform rewrites: signatures, substitutions and
+# the pipe trick. Saved text containing these differs from what was sent.
+PRE_SAVE_TRANSFORM = re.compile(r'~~~|\{\{\s*(?:safe)?subst:|\[\[[^\[\]|]*\|\]\]', re.IGNORECASE)
+
+
+@dataclass
+class Revision:
+    pageid: int
+    revid: int
+    timestamp: str
+    content: str
+
+
+class WikitextCache:
+    """LRU of page wikitext keyed by (page ID, revision ID).
+
+    Text is stored zlib-compressed and the cache holds at most ``max_bytes``
+    of compressed text. A revision's text never changes, so an entry is
+    valid for as long as its revision is the page's latest.
+    """
+
+    def __init__(self, max_bytes: int = 16 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.size = 0
+        # (pageid, revid) -> (title, timestamp, compressed text), least recently used first
+        self._entries: "OrderedDict[Tuple[int, int], Tuple[str, str, bytes]]" = OrderedDict()
+        # Title -> newest cached revision of that page
+        self._titles: Dict[str, Tuple[int, int]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def known(self, title: str) -> bool:
+        """Whether some revision of the page is cached."""
+        with self._lock:
+            return self._titles.get(title) in self._entries
+
+    def get(self, pageid: int, revid: int) -> Optional[Revision]:
+        with self._lock:
+            entry = self._entries.get((pageid, revid))
+            if entry is None:
+                return None
+            self._entries.move_to_end((pageid, revid))
+        _, timestamp, data = entry
+        return Revision(pageid, revid, timestamp, zlib.decompress(data).decode('utf-8'))
+
+    def put(self, title: str, revision: Revision) -> None:
+        data = zlib.compress(revision.content.encode('utf-8'))
+        if len(data) > self.max_bytes:
+            return
+        key = (revision.pageid, revision.revid)
+        with self._lock:
+            # Replaces this revision or an older one of the page; those are no longer useful
+            self._discard(key)
+            self._discard(self._titles.get(title))
+            self._entries[key] = (title, revision.timestamp, data)
+            self._titles[title] = key
+            self.size += len(data)
+            while self.size > self.max_bytes:
+                self._discard(next(iter(self._entries)))
+
+    def _discard(self, key: Optional[Tuple[int, int]]) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        title, _, data = entry
+        self.size -= len(data)
+        if self._titles.get(title) == key:
+            del self._titles[title]
+
+
+_cache: Optional[WikitextCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> WikitextCache:
+    """Return the process-wide WikitextCache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = WikitextCache(int(environ.get('WIKITEXT_CACHE_BYTES', str(16 * 1024 * 1024))))
+        return _cache
+
+
+def _fetch(S: WikiSession, title: str) -> Revision:
+    DATA = S.get({
+        "action": "query",
+        "prop": "revisions",
+        "titles": title,
+        "rvprop": "content|ids|timestamp",
+        "formatversion": "2"
+    })
+    page = DATA["query"]["pages"][0]
+    if page.get("missing"):
+        raise WikiError("missingtitle", f"{title} does not exist")
+    revision = page["revisions"][0]
+    return Revision(page["pageid"], revision["revid"], revision["timestamp"], revision["content"])
+
+
+def latest_revision(S: WikiSession, title: str, cache: Optional[WikitextCache] = None) -> Revision:
+    """Return the latest revision of a page, downloading its text only if it changed.
+
+    For a page with cached text, a ``prop=info`` query for its latest revision
+    ID decides whether the cached text is still current.
+    """
+    if cache is None:
+        cache = get_cache()
+    if cache.known(title):
+        DATA = S.get({
+            "action": "query",
+            "prop": "info",
+            "titles": title,
+            "formatversion": "2"
+        })
+        page = DATA["query"]["pages"][0]
+        if page.get("missing"):
+            raise WikiError("missingtitle", f"{title} does not exist")
+        revision = cache.get(page["pageid"], page["lastrevid"])
+        if revision is not None:
+            WIKITEXT_CACHE.inc(result='hit')
+            return revision
+        WIKITEXT_CACHE.inc(result='stale')
+    else:
+        WIKITEXT_CACHE.inc(result='miss')
+
+    revision = _fetch(S, title)
+    cache.put(title, revision)
+    return revision
+
+
+def remember_edit(title: str, text: str, DATA: Dict[str, Any], cache: Optional[WikitextCache] = None) -> None:
+    """Cache the text we just saved, so the next step or review need not download it.
+
+    Text the pre-save transform would change is not cached; the next read
+    downloads the saved revision instead.
+    """
+    edit = DATA.get("edit", {})
+    if edit.get("result") != "Success" or "newrevid" not in edit:
+        return
+    if PRE_SAVE_TRANSFORM.search(text):
+        return
+    # MediaWiki trims trailing whitespace when saving
+    revision = Revision(edit["pageid"], edit["newrevid"], edit["newtimestamp"], text.rstrip())
+    if cache is None:
+        cache = get_cache()
+    cache.put(title, revision)